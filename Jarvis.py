@@ -1,16 +1,48 @@
+import argparse
+import asyncio
+import importlib.util
+import re
 import sys
 import time
-from utils.class_models.ScreenMonitor import ScreenMonitor
-import utils.utils as utils
+from utils.class_models.StartupProfiler import startup_profiler
 
-# Try to import RealtimeSTT
-try:
-    from RealtimeSTT import AudioToTextRecorder
-    STT_AVAILABLE = True
-except ImportError:
-    STT_AVAILABLE = False
+# Enabled before the imports below so they are timed as well
+startup_profiler.enabled = "--startup-profile" in sys.argv
+
+with startup_profiler.step("import utils.utils"):
+    import utils.utils as utils
+with startup_profiler.step("import ScreenMonitor"):
+    from utils.class_models.ScreenMonitor import ScreenMonitor
+from utils.class_models.AssistantCore import AssistantCore
+from utils.class_models.LazyResource import LazyResource
+from utils.class_models.ShutdownCoordinator import ShutdownCoordinator
+from utils.class_models.Tracer import tracer
+
+# Only check that RealtimeSTT is installed, importing it pulls in torch and whisper
+STT_AVAILABLE = importlib.util.find_spec("RealtimeSTT") is not None
+
+ECHO_WORD_PATTERN = re.compile(r"[\w']+")
 
 class JarvisApp:
+    # Fixed spoken phrases, pre-rendered into the speech cache at startup
+    HISTORY_CLEARED_RESPONSE = "Conversation history has been cleared"
+    SHUTDOWN_RESPONSE = "Shutting down services"
+    COMMAND_PROMPT_RESPONSE = "Go ahead and give me a command"
+    MONITORING_ACTIVE_RESPONSE = "Screen monitoring is already active, Sir."
+    # The farewell is rendered separately into memory, see farewell_clip
+    SPOKEN_PHRASES = [HISTORY_CLEARED_RESPONSE, COMMAND_PROMPT_RESPONSE, MONITORING_ACTIVE_RESPONSE]
+    
+    # Per-component shutdown deadlines in seconds, components stop concurrently
+    SCREEN_MONITOR_STOP_DEADLINE = 1.0
+    RECORDER_STOP_DEADLINE = 2.0
+    AUDIO_STOP_DEADLINE = 3.0
+    
+    # Share of an utterance's words found in Jarvis's last response for it to count as an echo,
+    # checked while Jarvis speaks and for ECHO_WINDOW seconds after
+    ECHO_OVERLAP = 0.7
+    ECHO_MIN_WORDS = 3
+    ECHO_WINDOW = 2.0
+    
     def __init__(self):
         self.screen_monitor = ScreenMonitor()
         self.text_input_counter = 0
@@ -19,46 +51,83 @@ class JarvisApp:
                          "could I", "is it possible", "can I", "listen up", "screen", 
                          "monitor", "analyze", "look at", "review", "explain", "debug"]
         self.skip_hot_word_check = False
+        self.input_mode = None
+        self.echo_prefix = None
+        self.core = None
+        self.last_response = ""
+        self.last_response_time = 0.0
+        # Transcription time of the utterance the listener just returned, traced with its turn
+        self.recording_stopped_at = None
+        self.last_stt_seconds = None
+        utils.intent_matcher.add_phrases("hot_word", self.hot_words)
         
         # Store original streams for restoration
         self.original_stderr = sys.stderr
         self.original_stdout = sys.stdout
         self.conversation_history = []
+        
+        # Cloud client, audio output and router model load on background threads
+        utils.start_background_init()
+        
+        # Whisper loads while the rest of startup continues
+        self.recorder_loader = LazyResource("speech recorder", self.create_recorder)
+        if STT_AVAILABLE:
+            self.recorder_loader.start()
+        
+        # Render fixed phrases in the background so they play without a network round trip
+        utils.warm_speech_cache(self.SPOKEN_PHRASES + ScreenMonitor.SPOKEN_PHRASES)
+        # The farewell is held in memory so shutdown never waits on synthesis
+        self.farewell_clip = LazyResource("farewell clip", lambda: utils.render_speech(self.SHUTDOWN_RESPONSE)).start()
+        # Load the local model now so the first question does not pay a cold start
+        utils.warm_up_ollama()
+    
+    def create_recorder(self):
+        from RealtimeSTT import AudioToTextRecorder
+        return AudioToTextRecorder(
+            spinner=False, 
+            model="tiny.en", 
+            language="en", 
+            post_speech_silence_duration=0.5, 
+            silero_sensitivity=0.6,
+            on_recording_stop=self.mark_recording_stop
+        )
+    
+    def mark_recording_stop(self):
+        self.recording_stopped_at = time.time()
     
     def clear_history(self):
         self.conversation_history.clear()
-        utils.tts_caller("Conversation history has been cleared")
+        utils.tts_caller(self.HISTORY_CLEARED_RESPONSE)
         
+    def stop_audio(self, farewell):
+        # Let the farewell finish before the mixer goes away
+        if farewell is not None:
+            try:
+                farewell.result()
+            except Exception:
+                # Already reported by the engine, the mixer still has to stop
+                pass
+        utils.stop_audio_output()
+    
     def cleanup_and_exit(self):
-        """Graceful shutdown with proper cleanup order"""
+        """Graceful shutdown, components stop concurrently with per-component deadlines"""
         print("\nShutting down...")
-        utils.tts_caller("Shutting down services")
-        # Stop screen monitoring
-        if self.screen_monitor:
-            try:
-                self.screen_monitor.stop_monitoring()
-            except Exception as e:
-                print(f"⚠️ Screen monitor cleanup failed: {e}")
+        # At most one farewell clip, and only if it is already rendered
+        farewell = utils.play_speech(self.farewell_clip.peek())
+        if farewell is None:
+            print(f"🔇 {self.SHUTDOWN_RESPONSE}")
         
-        # Stop audio recorder
+        coordinator = ShutdownCoordinator()
+        if self.screen_monitor:
+            coordinator.add("Screen monitor", self.screen_monitor.shutdown, self.SCREEN_MONITOR_STOP_DEADLINE)
         if self.recorder:
-            try:
-                print("Stopping audio recorder...")
-                self.recorder.stop()
-                time.sleep(0.5)
-                print("✅ Audio recorder stopped")
-                utils.tts_caller("Audio recorder stopped")
-            except Exception as e:
-                print(f"⚠️ Audio recorder cleanup failed: {e}")
-        
-        # Announce mixer shutdown BEFORE actually stopping it
-        try:
-            utils.tts_caller("Audio mixer shutting down")
-            time.sleep(1)  # Give TTS time to finish
-            utils.mixer.quit()
-            print("✅ Audio mixer stopped")
-        except Exception as e:
-            print(f"⚠️ Audio mixer cleanup failed: {e}")
+            coordinator.add("Audio recorder", self.recorder.stop, self.RECORDER_STOP_DEADLINE)
+        coordinator.add("Audio output", lambda: self.stop_audio(farewell), self.AUDIO_STOP_DEADLINE)
+        coordinator.run()
+        utils.blob_store.close()
+        tracer.close()
+        if utils.RESPONSE_CACHE:
+            print(f"💾 Response cache: {utils.response_cache.describe()}")
         
         # Restore output streams (no TTS after mixer is gone)
         try:
@@ -72,72 +141,150 @@ class JarvisApp:
         print("Shutdown complete.")
         sys.exit(0)
     
+    def listen_text(self):
+        """Next non-empty line typed by the user, EOFError ends the session"""
+        while True:
+            current_text = input("You: ").strip()
+            if current_text:
+                print(f"User: {current_text}")
+                return current_text
+    
+    def listen_speech(self):
+        """Next transcribed utterance, the recorder keeps listening while Jarvis talks"""
+        current_text = self.recorder.text()
+        if self.recording_stopped_at is not None:
+            self.last_stt_seconds = time.time() - self.recording_stopped_at
+            self.recording_stopped_at = None
+        print(current_text)
+        return current_text
+    
+    def is_echo(self, utterance, response):
+        """Whether the microphone most likely picked up Jarvis's own voice"""
+        words = ECHO_WORD_PATTERN.findall(utterance.lower())
+        if len(words) < self.ECHO_MIN_WORDS or not response:
+            return False
+        spoken = set(ECHO_WORD_PATTERN.findall(response.lower()))
+        return sum(word in spoken for word in words) / len(words) >= self.ECHO_OVERLAP
+    
+    def should_interrupt(self, utterance, turn):
+        """Typed input always barges in, speech only when addressed to Jarvis and not an echo"""
+        if self.input_mode == "text":
+            return True
+        if self.is_echo(utterance, turn.response_text()):
+            return False
+        intents = utils.classify_intents(utterance)
+        return "hot_word" in intents or "shutdown" in intents
+    
+    async def say(self, text, echo=False):
+        """Speak a fixed phrase without blocking the event loop"""
+        if echo:
+            print(f"Jarvis: {text}")
+        self.last_response = text
+        await self.core.run_blocking(utils.tts_caller, text)
+        self.last_response_time = time.time()
+    
+    async def answer(self, turn, question, cacheable=True):
+        """Stream the model's answer into speech, both abort when the turn is interrupted"""
+        chunks = utils.ask_question_memory_stream(question, self.conversation_history,
+                                                  cacheable=cacheable, cancel_event=turn.cancel_event)
+        # Speech stops at the '#' marker
+        response = await utils.speak_stream_async(self.core.stream(chunks, turn), turn.cancel_event,
+                                                  echo_prefix=self.echo_prefix)
+        self.last_response = response
+        self.last_response_time = time.time()
+        return response
+    
+    async def handle_utterance(self, turn):
+        """Handle one utterance as a traced turn, shared by the text and speech modes"""
+        stt_seconds, self.last_stt_seconds = self.last_stt_seconds, None
+        with tracer.turn(mode=self.input_mode) as span:
+            if stt_seconds is not None:
+                tracer.record("stt", stt_seconds)
+            span["action"] = await self.respond(turn)
+    
+    async def respond(self, turn):
+        """Act on an utterance, returns what was done for the trace"""
+        current_text = turn.utterance
+        if not current_text:
+            return "empty"
+        if (self.input_mode == "speech" and time.time() - self.last_response_time < self.ECHO_WINDOW
+                and self.is_echo(current_text, self.last_response)):
+            print("🔁 Ignoring my own voice")
+            return "echo"
+        
+        # Classify the utterance against every vocabulary in one pass
+        with tracer.span("intents"):
+            intents = utils.classify_intents(current_text)
+        
+        # Check for shutdown
+        if "shutdown" in intents:
+            self.core.stop()
+            return "shutdown"
+        if not ("hot_word" in intents or self.skip_hot_word_check):
+            if self.input_mode == "text":
+                self.text_input_counter += 1
+                if self.text_input_counter == 10:
+                    print("Jarvis: I'm listening for a hot word to activate...")
+            return "no hot word"
+        
+        if self.input_mode == "speech":
+            print("User: " + current_text)
+        
+        # Check for screen monitoring commands
+        if utils.start_screen_monitor(current_text, intents):
+            if not self.screen_monitor.monitoring:
+                await self.core.run_blocking(self.screen_monitor.start_monitoring)
+                await self.say(self.COMMAND_PROMPT_RESPONSE)
+            else:
+                await self.say(self.MONITORING_ACTIVE_RESPONSE, echo=True)
+            self.skip_hot_word_check = True
+            return "start monitoring"
+            
+        # Natural screen analysis commands
+        elif self.screen_monitor.monitoring and self.screen_monitor.should_analyze_screen(current_text, intents):
+            request_type = self.screen_monitor.detect_request_type(current_text, intents)
+            request = await self.core.run_blocking(self.screen_monitor.prepare_screen_request,
+                                                   self.conversation_history, request_type, current_text)
+            if request is not None:
+                # Delta prompts only make sense next to the capture they refer to, so they skip the response cache
+                await self.answer(turn, request["prompt"], cacheable=False)
+                self.screen_monitor.finish_screen_request(request, self.conversation_history)
+            self.skip_hot_word_check = True
+            return "screen"
+            
+        elif utils.stop_screen_monitor(current_text, intents):
+            await self.core.run_blocking(self.screen_monitor.stop_monitoring)
+            self.skip_hot_word_check = True
+            return "stop monitoring"
+            
+        else:
+            # Process the regular request
+            current_text = current_text + " " + time.strftime("%Y-%m-%d %H-%M-%S")
+            response = await self.answer(turn, current_text)
+            
+            # Check if we should skip hot word check next time
+            self.skip_hot_word_check = True if "?" in response else False
+            return "answer"
+    
+    def run_core(self, input_mode, listen):
+        """Run the asyncio core until shutdown, end of input or Ctrl+C"""
+        self.input_mode = input_mode
+        self.echo_prefix = "Jarvis: " if input_mode == "text" else ""
+        self.core = AssistantCore(listen, self.handle_utterance, self.should_interrupt, utils.interrupt_speech)
+        try:
+            asyncio.run(self.core.run())
+        except KeyboardInterrupt:
+            pass
+        self.cleanup_and_exit()
+    
     def text_input_mode(self):
         """Text input mode with screen monitoring"""
         print("Jarvis Text Assistant Ready...")
         print("Type 'shutdown' or 'shut down' to exit.")
         print("Type 'screen monitor' to enable screen capture.")
+        print("Type while Jarvis is answering to interrupt.")
         print("=" * 100)
-        
-        try:
-            while True:
-                try:
-                    current_text = input("You: ").strip()
-                except EOFError:
-                    break
-                
-                if not current_text:
-                    continue
-                    
-                print(f"User: {current_text}")
-                
-                # Check for shutdown
-                if "shutdown" in current_text.lower() or "shut down" in current_text.lower():
-                    self.cleanup_and_exit()
-                if any(hot_word in current_text.lower() for hot_word in self.hot_words) or self.skip_hot_word_check:
-                    if current_text:
-                        # Check for screen monitoring commands
-                        if utils.start_screen_monitor(current_text):
-                            if not self.screen_monitor.monitoring:
-                                self.screen_monitor.start_monitoring()
-                                utils.tts_caller("Go ahead and give me a command")
-                            else:
-                                response = "Screen monitoring is already active, Sir."
-                                print(f"Jarvis: {response}")
-                                utils.tts_caller(response)
-                            self.skip_hot_word_check = True
-                            
-                        # Natural screen analysis commands
-                        elif self.screen_monitor.monitoring and self.screen_monitor.should_analyze_screen(current_text):
-                            request_type = self.screen_monitor.detect_request_type(current_text)
-                            self.screen_monitor.process_screen_request(self.conversation_history, request_type, current_text)
-                            self.skip_hot_word_check = True
-                            
-                        elif utils.stop_screen_monitor(current_text):
-                            self.screen_monitor.stop_monitoring()
-                            self.skip_hot_word_check = True
-                            
-                        else:
-                            # Process the regular request
-                            current_text = current_text + " " + time.strftime("%Y-%m-%d %H-%M-%S")
-                            response = utils.ask_question_memory(current_text, self.conversation_history)
-                            
-                            # Split response and speech
-                            speech = response.split('#')[0]
-                            print(f"Jarvis: {speech}")
-                            
-                            # Play TTS
-                            utils.tts_caller(speech)
-                            
-                            # Check if we should skip hot word check next time
-                            self.skip_hot_word_check = True if "?" in response else False
-                else:
-                    self.text_input_counter += 1
-                    if self.text_input_counter == 10:
-                        print("Jarvis: I'm listening for a hot word to activate...")
-                
-        except KeyboardInterrupt:
-            self.cleanup_and_exit()
+        self.run_core("text", self.listen_text)
     
     def speech_input_mode(self):
         """Speech input mode with screen monitoring"""
@@ -145,68 +292,24 @@ class JarvisApp:
             print("Speech to text not available, falling back to text mode")
             return self.text_input_mode()
             
-        self.recorder = AudioToTextRecorder(
-            spinner=False, 
-            model="tiny.en", 
-            language="en", 
-            post_speech_silence_duration=0.5, 
-            silero_sensitivity=0.6
-        )
+        if not self.recorder_loader.is_ready():
+            print("Loading speech recognition...")
+        try:
+            self.recorder = self.recorder_loader.get()
+        except Exception as e:
+            # Installed but unusable, e.g. torch or the audio backend is missing
+            print(f"⚠️ Speech recognition failed to start: {e}")
+            print("Speech to text not available, falling back to text mode")
+            return self.text_input_mode()
         
         print("Jarvis Is Listening . . .")
         print("Say 'screen monitor' to enable screen capture.")
-        
-        try:
-            while True:
-                current_text = self.recorder.text()
-                print(current_text)
-                if "shutdown" in current_text.lower() or "shut down" in current_text.lower():
-                    self.cleanup_and_exit()
-                if any(hot_word in current_text.lower() for hot_word in self.hot_words) or self.skip_hot_word_check:
-                    if current_text:
-                        print("User: " + current_text)
-                        self.recorder.stop()
-                        
-                        if "shutdown" in current_text.lower() or "shut down" in current_text.lower():
-                            self.cleanup_and_exit()
-                        
-                        # Screen monitoring commands
-                        elif utils.start_screen_monitor(current_text):
-                            if not self.screen_monitor.monitoring:
-                                self.screen_monitor.start_monitoring()
-                                utils.tts_caller("Go ahead and give me a command")
-                            else:
-                                response = "Screen monitoring is already active, Sir."
-                                utils.tts_caller(response)
-                            self.skip_hot_word_check = True
-                            self.recorder.start()
-                            
-                        # Natural screen analysis commands
-                        elif self.screen_monitor.monitoring and self.screen_monitor.should_analyze_screen(current_text):
-                            request_type = self.screen_monitor.detect_request_type(current_text)
-                            self.screen_monitor.process_screen_request(self.conversation_history, request_type, current_text)
-                            self.skip_hot_word_check = True
-                            self.recorder.start()
-                            
-                        elif utils.stop_screen_monitor(current_text):
-                            self.screen_monitor.stop_monitoring()
-                            self.skip_hot_word_check = True
-                            self.recorder.start()
-                            
-                        else:
-                            current_text = current_text + " " + time.strftime("%Y-%m-%d %H-%M-%S")
-                            response = utils.ask_question_memory(current_text, self.conversation_history)
-                            print(response)
-                            speech = response.split('#')[0]
-                            utils.tts_caller(speech)
-                            self.skip_hot_word_check = True if "?" in response else False
-                            self.recorder.start()
-                
-        except KeyboardInterrupt:
-            self.cleanup_and_exit()
+        print("Say 'Jarvis' while I'm answering to interrupt.")
+        self.run_core("speech", self.listen_speech)
     
     def run(self):
         """Main entry point"""
+        startup_profiler.report()
         if STT_AVAILABLE:
             print("RealtimeSTT detected - Using speech input mode")
             self.speech_input_mode()
@@ -215,5 +318,27 @@ class JarvisApp:
             self.text_input_mode()
 
 if __name__ == '__main__':
-    app = JarvisApp()
-    app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Jarvis AI Assistant")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print the time spent on each import and initialization step")
+    parser.add_argument("--server", action="store_true",
+                        help="serve many sessions over HTTP and WebSocket instead of the console")
+    parser.add_argument("--host", default=utils.SERVER_HOST, help="address the server listens on")
+    parser.add_argument("--port", type=int, default=utils.SERVER_PORT, help="port the server listens on")
+    args = parser.parse_args()
+    
+    if args.server:
+        try:
+            from utils.class_models.JarvisServer import JarvisServer
+        except ImportError as e:
+            print(f"❌ Server mode needs aiohttp ({e}), install it with: pip install aiohttp")
+            sys.exit(1)
+        server = JarvisServer(max_sessions=utils.SERVER_MAX_SESSIONS, session_ttl=utils.SERVER_SESSION_TTL,
+                              session_concurrency=utils.SERVER_SESSION_CONCURRENCY, workers=utils.SERVER_WORKERS,
+                              token=utils.SERVER_TOKEN)
+        startup_profiler.report()
+        server.run(args.host, args.port)
+    else:
+        with startup_profiler.step("JarvisApp init"):
+            app = JarvisApp()
+        app.run()
\ No newline at end of file
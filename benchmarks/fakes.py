@@ -0,0 +1,326 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+# Splits replies into word-sized pieces, roughly how models stream them
+TOKEN_PATTERN = re.compile(r"\S+\s*")
+
+def tokens(text):
+    return TOKEN_PATTERN.findall(text)
+
+def prompt_token_count(messages):
+    """Rough prompt size, about one token per word"""
+    count = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(block.get("text", "") for block in content)
+        count += len(str(content).split())
+    return count
+
+def stream_tokens(reply, first_token_delay, tokens_per_second, stop=None):
+    """Yield reply tokens with the configured first-token delay and token rate"""
+    time.sleep(first_token_delay)
+    interval = 1 / tokens_per_second if tokens_per_second else 0
+    for index, token in enumerate(tokens(reply)):
+        if stop is not None and stop.is_set():
+            return
+        if index:
+            time.sleep(interval)
+        yield token
+
+class FakeOllamaServer:
+    """In-process HTTP server speaking enough of the Ollama API for Jarvis.
+
+    GET /api/tags answers health probes and POST /api/chat streams the
+    configured reply as NDJSON with a first-token delay and a token rate.
+    config can be changed between requests.
+    """
+
+    def __init__(self, reply="Certainly, Sir.", first_token_delay=0.1, tokens_per_second=40.0, load_duration=0.0):
+        self.config = {
+            "reply": reply,
+            "first_token_delay": first_token_delay,
+            "tokens_per_second": tokens_per_second,
+            "load_duration": load_duration,
+            "healthy": True
+        }
+        self.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive with chunked bodies like Ollama, so each NDJSON line reaches the client as it is sent
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    # The client dropped a pooled connection between requests
+                    pass
+
+            def do_GET(self):
+                if self.path != "/api/tags":
+                    self.send_error(404)
+                    return
+                body = json.dumps({"models": []}).encode("utf-8")
+                self.send_response(200 if fake.config["healthy"] else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path != "/api/chat":
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                fake.requests += 1
+                config = dict(fake.config)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                # Warm-up requests ask for a single token
+                reply = config["reply"]
+                if body.get("options", {}).get("num_predict") == 1:
+                    reply = tokens(reply)[0] if tokens(reply) else ""
+                generated = 0
+                try:
+                    for token in stream_tokens(reply, config["first_token_delay"], config["tokens_per_second"]):
+                        generated += 1
+                        self._send_line({"message": {"role": "assistant", "content": token}, "done": False})
+                    self._send_line({
+                        "message": {"role": "assistant", "content": ""},
+                        "done": True,
+                        "prompt_eval_count": prompt_token_count(body.get("messages", [])),
+                        "eval_count": generated,
+                        "load_duration": int(config["load_duration"] * 1e9)
+                    })
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client hung up mid-stream, e.g. on an escalation phrase
+                    self.close_connection = True
+
+            def _send_line(self, payload):
+                line = (json.dumps(payload) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-ollama", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class FakeOpenAIStream:
+    def __init__(self, reply, config, prompt_tokens):
+        self.reply = reply
+        self.config = config
+        self.prompt_tokens = prompt_tokens
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        generated = 0
+        for token in stream_tokens(self.reply, self.config["first_token_delay"], self.config["tokens_per_second"], self.closed):
+            generated += 1
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+        if not self.closed.is_set():
+            yield SimpleNamespace(usage=openai_usage(self.prompt_tokens, generated), choices=[])
+
+    def close(self):
+        self.closed.set()
+
+def openai_usage(prompt_tokens, completion_tokens):
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                           prompt_tokens_details=SimpleNamespace(cached_tokens=0))
+
+class FakeOpenAI:
+    """Stand-in for openai.OpenAI with the chat.completions.create calls Jarvis makes"""
+
+    def __init__(self, config):
+        self.config = config
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, stream=False, **kwargs):
+        reply = self.config["reply"]
+        prompt_tokens = prompt_token_count(messages)
+        if stream:
+            return FakeOpenAIStream(reply, self.config, prompt_tokens)
+        text = "".join(stream_tokens(reply, self.config["first_token_delay"], self.config["tokens_per_second"]))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+                               usage=openai_usage(prompt_tokens, len(tokens(text))))
+
+def claude_usage(input_tokens, output_tokens):
+    return SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens,
+                           cache_read_input_tokens=0, cache_creation_input_tokens=0)
+
+class FakeClaudeStream:
+    def __init__(self, reply, config, input_tokens):
+        self.reply = reply
+        self.config = config
+        self.input_tokens = input_tokens
+        self.generated = 0
+        self.closed = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed.set()
+        return False
+
+    @property
+    def text_stream(self):
+        for token in stream_tokens(self.reply, self.config["first_token_delay"], self.config["tokens_per_second"], self.closed):
+            self.generated += 1
+            yield token
+
+    def get_final_message(self):
+        return SimpleNamespace(usage=claude_usage(self.input_tokens, self.generated))
+
+class FakeAnthropic:
+    """Stand-in for anthropic.Anthropic with the messages.create and messages.stream calls Jarvis makes"""
+
+    def __init__(self, config):
+        self.config = config
+        self.messages = SimpleNamespace(create=self.create, stream=self.stream)
+
+    def create(self, model, messages, system=None, **kwargs):
+        text = "".join(stream_tokens(self.config["reply"], self.config["first_token_delay"], self.config["tokens_per_second"]))
+        return SimpleNamespace(content=[SimpleNamespace(text=text)],
+                               usage=claude_usage(prompt_token_count(messages), len(tokens(text))))
+
+    def stream(self, model, messages, system=None, **kwargs):
+        return FakeClaudeStream(self.config["reply"], self.config, prompt_token_count(messages))
+
+class FakeTTSEngine:
+    """Stand-in for TTSEngine: synthesis sleeps, playback waits out the clip length without a mixer.
+
+    Clips last speech_seconds_per_char per character divided by playback_speed,
+    so long answers still take time to speak without slowing the benchmark down.
+    on_play is called as each clip starts playing.
+    """
+
+    def __init__(self, synth_delay=0.1, synth_per_char=0.001, speech_seconds_per_char=0.06, playback_speed=20.0, on_play=None):
+        self.synth_delay = synth_delay
+        self.synth_per_char = synth_per_char
+        self.speech_seconds_per_char = speech_seconds_per_char
+        self.playback_speed = playback_speed
+        self.on_play = on_play
+        self.cache = None
+        self.playback_lock = threading.Lock()
+        self.stop_requested = threading.Event()
+
+    def synthesize(self, text):
+        time.sleep(self.synth_delay + self.synth_per_char * len(text))
+        return text.encode("utf-8")
+
+    def warm_up(self, phrases):
+        return 0
+
+    def play(self, audio):
+        done = Future()
+        self.stop_requested.clear()
+        if self.on_play is not None:
+            self.on_play()
+        threading.Thread(target=self._play, args=(audio, done), name="fake-playback", daemon=True).start()
+        return done
+
+    def _play(self, audio, done):
+        with self.playback_lock:
+            # A barge-in may have cancelled the future while the clip waited for the lock
+            if not done.set_running_or_notify_cancel():
+                return
+            if not self.stop_requested.is_set():
+                self.stop_requested.wait(len(audio) * self.speech_seconds_per_char / self.playback_speed)
+            done.set_result(True)
+
+    def stop(self):
+        self.stop_requested.set()
+
+    def speak(self, text):
+        self.play(self.synthesize(text)).result()
+        return True
+
+    def shutdown(self):
+        pass
+
+def render_code_screenshot(line_count=60, width=1920, height=1080, dark=True, first_line=1, line_height=16):
+    """Editor-like screenshot drawn with PIL: a line-number gutter and generated code"""
+    from PIL import Image, ImageDraw, ImageFont
+    background, foreground, gutter = ((30, 30, 30), (212, 212, 212), (110, 110, 110)) if dark else \
+        ((255, 255, 255), (20, 20, 20), (150, 150, 150))
+    image = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+    for row in range(min(line_count, (height - 20) // line_height)):
+        number = first_line + row
+        indent = "    " * (row % 3)
+        code = f"{indent}total_{number} = scale(values[{number}], factor={number % 7}) + offset  # step {number}"
+        top = 10 + row * line_height
+        draw.text((10, top), f"{number:>4}", fill=gutter, font=font)
+        draw.text((60, top), code, fill=foreground, font=font)
+    return image
+
+class FakeOCREngine:
+    """Stand-in for ScreenOCREngine: preprocessing is real, tesseract's share is a sleep.
+
+    Each band takes band_delay plus seconds_per_megapixel of its preprocessed
+    size, bands run concurrently on `workers` threads the way the process pool
+    runs them. The text returned is chars_per_line characters for every
+    line_height pixels of band, so prompts grow with the screen like real OCR.
+    """
+
+    def __init__(self, band_delay=0.05, seconds_per_megapixel=0.4, workers=4, line_height=16,
+                 chars_per_line=70, scale=2.0, binarize=True):
+        self.band_delay = band_delay
+        self.seconds_per_megapixel = seconds_per_megapixel
+        self.workers = workers
+        self.line_height = line_height
+        self.chars_per_line = chars_per_line
+        self.scale = scale
+        self.binarize = binarize
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fake-ocr")
+
+    def ocr_band(self, image):
+        from utils.class_models.ScreenOCREngine import preprocess
+        processed = preprocess(image, self.scale, self.binarize)
+        time.sleep(self.band_delay + self.seconds_per_megapixel * processed.width * processed.height / 1e6)
+        line = ("x" * (self.chars_per_line - 1)) + " "
+        return "\n".join(line for _ in range(max(1, image.height // self.line_height)))
+
+    def ocr_bands(self, images, nice=0, parallel=True):
+        if not parallel or len(images) <= 1:
+            return [self.ocr_band(image) for image in images]
+        return list(self.executor.map(self.ocr_band, images))
+
+    def start(self):
+        pass
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
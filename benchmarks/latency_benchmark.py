@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from benchmarks.fakes import FakeAnthropic, FakeOCREngine, FakeOllamaServer, FakeOpenAI, FakeTTSEngine, render_code_screenshot
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCENARIOS = os.path.join(BENCHMARK_DIR, "latency_scenarios.json")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "latency_baseline.json")
+METRICS = ("ttft", "ttfa", "total")
+
+# Probe of the turn running in this context, the fakes and stream wrapper mark it
+current_probe = contextvars.ContextVar("current_probe", default=None)
+
+class Probe:
+    """Times one turn: first text chunk, first audio clip and the end"""
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.marks = {}
+        self.cancelled = False
+
+    def mark(self, name):
+        self.marks.setdefault(name, time.perf_counter() - self.started)
+
+    def result(self):
+        return {metric: self.marks.get(metric) for metric in METRICS}
+
+def mark(name):
+    probe = current_probe.get()
+    if probe is not None:
+        probe.mark(name)
+
+def configure_environment(ollama_url):
+    """Settings utils.py reads at import, so every run starts from the same state"""
+    os.environ.update({
+        "OLLAMA_BASE_URL": ollama_url,
+        "OLLAMA_WARMUP": "false",
+        "HEDGED_ROUTING": "false",
+        "RESPONSE_CACHE": "false",
+        "ROUTER_LOGGING": "false",
+        "ROUTER_MODEL": os.path.join(BENCHMARK_DIR, "no-router-model.npz"),
+        "TTS_CACHE": "false",
+        "TTS_CACHE_WARMUP": "false",
+        "TRACING": "false",
+        "ENABLE_AUDIO": "false"
+    })
+
+class Harness:
+    """Wires the fakes into utils.py and runs scenarios against them"""
+
+    def __init__(self, fakes):
+        self.fakes = fakes
+        self.server = FakeOllamaServer(**fakes["ollama"]).start()
+        self.cloud_config = dict(fakes["cloud"], reply="Certainly, Sir.")
+        configure_environment(self.server.base_url)
+
+        # Imported only now, utils.py reads its configuration at import time
+        import utils.utils as utils
+        from utils.class_models.LazyResource import LazyResource
+        self.utils = utils
+        self.tts = FakeTTSEngine(on_play=lambda: mark("ttfa"), **fakes["tts"])
+        utils.audio_output = LazyResource("audio output", lambda: self.tts)
+        self.clients = {"openai": FakeOpenAI(self.cloud_config), "claude": FakeAnthropic(self.cloud_config)}
+        self.original_stream = utils.ask_question_memory_stream
+        utils.ask_question_memory_stream = self.traced_stream
+
+    def traced_stream(self, *args, **kwargs):
+        """ask_question_memory_stream that marks the first chunk reaching its consumer"""
+        for chunk in self.original_stream(*args, **kwargs):
+            mark("ttft")
+            yield chunk
+
+    def prepare(self, scenario, turn=None):
+        """Point the fakes at a scenario, turn-level replies override scenario-level ones"""
+        utils = self.utils
+        self.server.config.update(self.fakes["ollama"], reply="Certainly, Sir.")
+        self.server.config.update(scenario.get("ollama", {}))
+        self.cloud_config.update(self.fakes["cloud"], reply="Certainly, Sir.")
+        self.cloud_config.update(scenario.get("cloud", {}))
+        if turn is not None:
+            self.server.config.update(turn.get("ollama", {}))
+            self.cloud_config.update(turn.get("cloud", {}))
+
+        backend = scenario.get("backend", "openai")
+        utils.USE_OPENAI = backend == "openai"
+        utils.MODEL_NAME = f"fake-{backend}"
+        client = self.clients[backend]
+        utils.cloud_client = type(utils.cloud_client)("cloud client", lambda: client)
+        utils.RESPONSE_CACHE = scenario.get("response_cache", False)
+        utils.ollama_client.mark_healthy()
+
+    def run_questions(self, scenario):
+        """ask and stream drivers, one turn per question sharing a history"""
+        utils = self.utils
+        self.prepare(scenario)
+        utils.response_cache.clear()
+        history = []
+        results = []
+        for question in scenario["questions"]:
+            question = question + " " + time.strftime("%Y-%m-%d %H-%M-%S")
+            probe = Probe()
+            token = current_probe.set(probe)
+            try:
+                if scenario["driver"] == "ask":
+                    # The whole answer arrives at once
+                    utils.ask_question_memory(question, history)
+                    probe.mark("ttft")
+                else:
+                    utils.tts_stream_caller(utils.ask_question_memory_stream(question, history))
+                probe.mark("total")
+            finally:
+                current_probe.reset(token)
+            results.append(probe.result())
+        return results
+
+    def run_screen(self, scenario):
+        """ScreenMonitor.process_screen_request against each of the scenario's generated screenshots"""
+        try:
+            from utils.class_models.ScreenMonitor import ScreenMonitor
+            screenshots = [render_code_screenshot(**screen) for screen in scenario["screens"]]
+        except ImportError as e:
+            return None, f"screen capture unavailable ({e})"
+
+        self.prepare(scenario)
+        results = []
+        monitor = ScreenMonitor()
+        monitor.ocr_engine = FakeOCREngine(**self.fakes["ocr"])
+        try:
+            for screenshot in screenshots:
+                monitor.grab_screen = lambda region=None: screenshot
+                # A fresh cache and history per screenshot, so every run OCRs and sends in full
+                monitor.ocr_cache.clear()
+                monitor.last_capture = None
+                probe = Probe()
+                token = current_probe.set(probe)
+                try:
+                    monitor.process_screen_request([], scenario.get("request_type", "analyze"), scenario.get("text", ""))
+                    probe.mark("total")
+                finally:
+                    current_probe.reset(token)
+                results.append(probe.result())
+        finally:
+            monitor.shutdown()
+        return results, None
+
+    def run_app(self, scenario):
+        """Scripted text session through the JarvisApp core, including barge-in"""
+        import Jarvis
+        self.prepare(scenario)
+        app = Jarvis.JarvisApp()
+        app.cleanup_and_exit = lambda: None
+        turns = scenario["turns"]
+        arrivals = {}
+        finished = {index: threading.Event() for index in range(len(turns))}
+        probes = {}
+
+        def listen():
+            index = len(arrivals)
+            if index >= len(turns):
+                # Let the last turn finish before the session ends
+                finished[index - 1].wait(30)
+                raise EOFError
+            # Barge-in turns arrive while the previous one is still answering
+            if index and turns[index].get("wait_idle", True):
+                finished[index - 1].wait(30)
+            time.sleep(turns[index].get("after", 0.2))
+            self.prepare(scenario, turns[index])
+            arrivals[index] = time.perf_counter()
+            return turns[index]["text"]
+
+        handle = app.handle_utterance
+        order = iter(range(len(turns)))
+
+        async def timed_handle(turn):
+            index = next(order)
+            probe = probes[index] = Probe(arrivals[index])
+            current_probe.set(probe)
+            try:
+                await handle(turn)
+            except asyncio.CancelledError:
+                probe.cancelled = True
+                raise
+            finally:
+                probe.mark("total")
+                finished[index].set()
+
+        app.handle_utterance = timed_handle
+        app.run_core("text", listen)
+        results = []
+        for index in range(len(turns)):
+            probe = probes.get(index)
+            result = probe.result() if probe else dict.fromkeys(METRICS)
+            result["cancelled"] = bool(probe and probe.cancelled)
+            results.append(result)
+        return results
+
+    def run(self, scenario):
+        """Per-turn results of one scenario, or (None, reason) when it cannot run here"""
+        driver = scenario["driver"]
+        if driver in ("ask", "stream"):
+            return self.run_questions(scenario), None
+        if driver == "screen":
+            return self.run_screen(scenario)
+        if driver == "app":
+            return self.run_app(scenario), None
+        return None, f"unknown driver '{driver}'"
+
+    def close(self):
+        self.server.stop()
+
+def median_results(runs):
+    """Median of each metric over repeated runs of the same turn"""
+    merged = {}
+    for metric in METRICS:
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        merged[metric] = statistics.median(values) if values else None
+    merged["cancelled"] = any(run.get("cancelled") for run in runs)
+    return merged
+
+def regressed(value, baseline, tolerance, slack):
+    return value is not None and baseline is not None and value > baseline * (1 + tolerance) + slack
+
+def format_seconds(value):
+    return f"{value:.3f}s" if value is not None else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end turn latency against local stand-ins for Ollama, cloud APIs and TTS")
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS, help="scenario file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline results to compare against")
+    parser.add_argument("--only", action="append", help="only run scenarios with this name, repeatable")
+    parser.add_argument("--runs", type=int, default=3, help="runs per scenario, the median is kept")
+    parser.add_argument("--tolerance", type=float, default=None, help="allowed slowdown over the baseline, e.g. 0.25")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--verbose", action="store_true", help="show Jarvis's own output while scenarios run")
+    args = parser.parse_args()
+
+    with open(args.scenarios, "r", encoding="utf-8") as f:
+        suite = json.load(f)
+    baseline = {"tolerance": 0.25, "slack": 0.05, "results": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline.update(json.load(f))
+    tolerance = args.tolerance if args.tolerance is not None else baseline["tolerance"]
+    slack = baseline["slack"]
+
+    # Jarvis logs every turn in detail, only the results table is shown by default
+    quiet = contextlib.nullcontext if args.verbose else lambda: contextlib.redirect_stdout(io.StringIO())
+    with quiet():
+        harness = Harness(suite["fakes"])
+    results = {}
+    regressions = []
+    try:
+        print(f"{'scenario':<40} {'ttft':>8} {'ttfa':>8} {'total':>8}  status")
+        for scenario in suite["scenarios"]:
+            if args.only and scenario["name"] not in args.only:
+                continue
+            runs = []
+            for _ in range(args.runs):
+                with quiet():
+                    turn_results, skipped = harness.run(scenario)
+                if turn_results is None:
+                    break
+                runs.append(turn_results)
+            if not runs:
+                print(f"{scenario['name'][:40]:<40} {'':>8} {'':>8} {'':>8}  ⏭️ skipped: {skipped}")
+                continue
+
+            for index in range(len(runs[0])):
+                key = f"{scenario['name']} #{index + 1}"
+                result = median_results([run[index] for run in runs])
+                results[key] = result
+                expected = baseline["results"].get(key)
+                if expected is None:
+                    status = "🆕 no baseline"
+                else:
+                    slow = [metric for metric in METRICS if regressed(result[metric], expected.get(metric), tolerance, slack)]
+                    if slow:
+                        regressions.append((key, slow))
+                        status = "❌ slower: " + ", ".join(
+                            f"{metric} {format_seconds(result[metric])} vs {format_seconds(expected[metric])}" for metric in slow)
+                    else:
+                        status = "✅"
+                if result["cancelled"]:
+                    status += " (interrupted)"
+                print(f"{key[:40]:<40} {format_seconds(result['ttft']):>8} {format_seconds(result['ttfa']):>8} "
+                      f"{format_seconds(result['total']):>8}  {status}")
+    finally:
+        harness.close()
+
+    if args.update_baseline:
+        baseline["results"] = results
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"❌ {len(regressions)} turns regressed past the baseline (tolerance {tolerance:.0%} + {slack:.2f}s)")
+        return 1
+    print("✅ No regressions against the baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import argparse
+import difflib
+import glob
+import os
+import time
+from utils.class_models.ScreenOCRCache import ScreenOCRCache
+from utils.class_models.ScreenOCREngine import ScreenOCREngine
+
+IMAGE_PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+
+def character_accuracy(reference, text):
+    """Share of reference characters reproduced in order, ignoring whitespace differences"""
+    reference = " ".join(reference.split())
+    text = " ".join(text.split())
+    if not reference:
+        return 1.0 if not text else 0.0
+    matcher = difflib.SequenceMatcher(None, reference, text, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / len(reference)
+
+def load_screenshots(directory):
+    """(name, image, reference text or None) for every image, references come from name.txt"""
+    from PIL import Image
+    paths = sorted(path for pattern in IMAGE_PATTERNS for path in glob.glob(os.path.join(directory, pattern)))
+    screenshots = []
+    for path in paths:
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                reference = f.read()
+        with Image.open(path) as image:
+            screenshots.append((os.path.basename(path), image.convert("RGB"), reference))
+    return screenshots
+
+def baseline_ocr(image):
+    """What capture_screen used to do, one tesseract run over the full color frame"""
+    import pytesseract
+    return pytesseract.image_to_string(image)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare banded parallel OCR against single-pass OCR")
+    parser.add_argument("screenshots", help="directory of screenshots, with optional name.txt reference text")
+    parser.add_argument("--workers", type=int, default=None, help="OCR worker processes (default: cores - 1)")
+    parser.add_argument("--scale", type=float, default=2.0)
+    parser.add_argument("--no-binarize", action="store_true")
+    parser.add_argument("--runs", type=int, default=1, help="timed runs per screenshot, the best is kept")
+    args = parser.parse_args()
+
+    screenshots = load_screenshots(args.screenshots)
+    if not screenshots:
+        print(f"❌ No screenshots found in {args.screenshots}")
+        return
+
+    engine = ScreenOCREngine(workers=args.workers, scale=args.scale, binarize=not args.no_binarize)
+    # Spawn the pool before timing so process start-up is not charged to the first image
+    pool_start = time.time()
+    engine.ocr_bands([screenshots[0][1].crop((0, 0, 8, 8))] * 2)
+    print(f"⏱️ Started {engine.workers} OCR workers in {time.time() - pool_start:.2f}s")
+
+    totals = {"baseline": 0.0, "banded": 0.0}
+    print(f"{'screenshot':<32} {'size':>11} {'baseline':>9} {'banded':>9} {'speedup':>8} {'acc base':>9} {'acc band':>9}")
+    try:
+        for name, image, reference in screenshots:
+            baseline_time = banded_time = float("inf")
+            for _ in range(args.runs):
+                start = time.time()
+                baseline_text = baseline_ocr(image)
+                baseline_time = min(baseline_time, time.time() - start)
+
+                # A fresh cache each run, so every band is OCR'd
+                start = time.time()
+                banded_text, _ = ScreenOCRCache().extract(image, engine.ocr_bands)
+                banded_time = min(banded_time, time.time() - start)
+
+            totals["baseline"] += baseline_time
+            totals["banded"] += banded_time
+            # Without a reference the baseline output is the yardstick
+            if reference is None:
+                baseline_accuracy = "n/a"
+                banded_accuracy = f"{character_accuracy(baseline_text, banded_text):.1%}*"
+            else:
+                baseline_accuracy = f"{character_accuracy(reference, baseline_text):.1%}"
+                banded_accuracy = f"{character_accuracy(reference, banded_text):.1%}"
+            size = f"{image.width}x{image.height}"
+            print(f"{name[:32]:<32} {size:>11} {baseline_time:>8.2f}s {banded_time:>8.2f}s "
+                  f"{baseline_time / max(banded_time, 1e-9):>7.1f}x {baseline_accuracy:>9} {banded_accuracy:>9}")
+    finally:
+        engine.shutdown()
+
+    print(f"Total: baseline {totals['baseline']:.2f}s, banded {totals['banded']:.2f}s, "
+          f"speedup {totals['baseline'] / max(totals['banded'], 1e-9):.1f}x")
+    if any(reference is None for _, _, reference in screenshots):
+        print("* agreement with the baseline output, no reference text available")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.class_models.Tracer import run_in_context
+
+# Marks the end of a chunk stream on the asyncio side
+_END = object()
+
+class Turn:
+    """One utterance being answered, cancelled when a newer one barges in"""
+
+    def __init__(self, utterance):
+        self.utterance = utterance
+        # Checked by model calls and the speech pipeline on their own threads
+        self.cancel_event = threading.Event()
+        self.task = None
+        self.chunks = []
+        # Executor futures of the threads pumping this turn's chunk streams
+        self.pumps = []
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def response_text(self):
+        """Response streamed so far"""
+        return "".join(self.chunks)
+
+    async def wait_for_pumps(self, timeout):
+        """Wait until no thread is still streaming for this turn, False on timeout"""
+        pending = [pump for pump in self.pumps if not pump.done()]
+        if pending:
+            _, pending = await asyncio.wait(pending, timeout=timeout)
+        return not pending
+
+def post(loop, queue, item):
+    """Hand an item to the event loop from another thread, False once the loop is gone"""
+    try:
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+        return True
+    except RuntimeError:
+        return False
+
+async def stream_chunks(loop, executor, chunks, turn):
+    """Iterate a blocking chunk generator on an executor thread, yielding chunks as they arrive"""
+    pending = asyncio.Queue()
+
+    def pump():
+        try:
+            for chunk in chunks:
+                if turn.cancelled or not post(loop, pending, (chunk, None)):
+                    break
+        except Exception as e:
+            post(loop, pending, (_END, e))
+        finally:
+            # Closing the generator lets it drop its HTTP stream
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            post(loop, pending, (_END, None))
+
+    turn.pumps.append(loop.run_in_executor(executor, run_in_context(pump)))
+    while True:
+        chunk, error = await pending.get()
+        if error is not None:
+            raise error
+        if chunk is _END:
+            return
+        turn.chunks.append(chunk)
+        yield chunk
+
+class AssistantCore:
+    """asyncio core that overlaps listening, answering and speaking.
+
+    listen() blocks until the next utterance (a speech recorder or input())
+    and runs on its own thread, so input keeps arriving while Jarvis answers.
+    Utterances reach the dispatcher through a queue, each one becomes a Turn
+    handled by the handle(turn) coroutine as its own task. An utterance that
+    arrives mid-turn barges in when should_interrupt(utterance, turn) agrees:
+    the turn's cancel_event aborts the model call, interrupt() cuts playback
+    and the turn task is cancelled before the new one starts.
+    """
+
+    # How long an interrupted turn's model stream gets to unwind before the next turn starts
+    PUMP_STOP_TIMEOUT = 5.0
+
+    def __init__(self, listen, handle, should_interrupt=None, interrupt=None, workers=4):
+        self.listen = listen
+        self.handle = handle
+        self.should_interrupt = should_interrupt
+        self.interrupt = interrupt
+        # Blocking stages (model streams, screen capture, fixed phrases) run here
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="core")
+
+        self.loop = None
+        self.utterances = None
+        self.stopping = threading.Event()
+        self.turn = None
+
+    def _post(self, queue, item):
+        return post(self.loop, queue, item)
+
+    def _listen(self):
+        while not self.stopping.is_set():
+            try:
+                utterance = self.listen()
+            except EOFError:
+                utterance = None
+            except Exception as e:
+                print(f"⚠️ Listener stopped: {e}")
+                utterance = None
+            if not self._post(self.utterances, utterance) or utterance is None:
+                return
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking call on the core's worker threads, in the caller's trace context"""
+        return await self.loop.run_in_executor(self.executor, run_in_context(func, *args))
+
+    def stream(self, chunks, turn):
+        """Async iterator over a blocking chunk generator, pumped on the core's worker threads"""
+        return stream_chunks(self.loop, self.executor, chunks, turn)
+
+    async def _run_turn(self, turn):
+        try:
+            await self.handle(turn)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"💥 Error handling request: {e}")
+
+    async def cancel_turn(self):
+        """Abort the turn in progress and wait until it has unwound"""
+        turn = self.turn
+        if turn is None or turn.task is None or turn.task.done():
+            return
+        turn.cancel_event.set()
+        if self.interrupt:
+            self.interrupt()
+        turn.task.cancel()
+        try:
+            await turn.task
+        except asyncio.CancelledError:
+            pass
+        # The stream still records the interrupted exchange in the history as it unwinds,
+        # that has to land before the next turn adds its question
+        if not await turn.wait_for_pumps(self.PUMP_STOP_TIMEOUT):
+            print("⚠️ Interrupted answer is still unwinding")
+
+    def busy(self):
+        return self.turn is not None and self.turn.task is not None and not self.turn.task.done()
+
+    def stop(self):
+        """End run(), callable from any thread including a turn"""
+        self.stopping.set()
+        if self.loop is not None:
+            self._post(self.utterances, None)
+
+    async def run(self):
+        """Dispatch utterances until the listener runs dry or stop() is called"""
+        self.loop = asyncio.get_running_loop()
+        self.utterances = asyncio.Queue()
+        threading.Thread(target=self._listen, name="core-listen", daemon=True).start()
+        try:
+            while not self.stopping.is_set():
+                utterance = await self.utterances.get()
+                if utterance is None:
+                    break
+                if self.busy():
+                    if self.should_interrupt is not None and not self.should_interrupt(utterance, self.turn):
+                        continue
+                    print("✋ Interrupted")
+                    await self.cancel_turn()
+                self.turn = Turn(utterance)
+                self.turn.task = asyncio.create_task(self._run_turn(self.turn))
+            if self.busy() and not self.stopping.is_set():
+                # Input ended, let the last answer finish
+                await self.turn.task
+        finally:
+            await self.cancel_turn()
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,146 @@
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+class BlobRef:
+    """Compact stand-in for a large message body held in a BlobStore.
+
+    len() is the length of the full text, so token estimates work without
+    loading it, and preview holds its opening characters for summaries.
+    """
+    __slots__ = ("keys", "length", "preview")
+
+    def __init__(self, keys, length, preview):
+        self.keys = keys
+        self.length = length
+        self.preview = preview
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return f"BlobRef({len(self.keys)} chunks, {self.length} chars)"
+
+class BlobStore:
+    """Content-addressed store for large message bodies.
+
+    Text is split into chunks at content-defined line boundaries, so the same
+    screen capture inside two differently worded prompts still shares its
+    chunks. Chunks are kept in memory up to max_memory bytes, the least
+    recently used ones beyond that are spilled to disk and memory-mapped when
+    read back.
+    """
+
+    def __init__(self, max_memory=8 * 1024 * 1024, spill_dir=None, chunk_mask=0x0F, max_chunk=8192, preview_chars=400):
+        self.max_memory = max_memory
+        self.spill_dir = spill_dir
+        self.owns_spill_dir = False
+        # A line ends a chunk when its hash matches the mask, about one line in sixteen
+        self.chunk_mask = chunk_mask
+        self.max_chunk = max_chunk
+        self.preview_chars = preview_chars
+
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()  # key -> bytes, least recently used first
+        self.memory_bytes = 0
+        self.spilled = {}  # key -> size on disk
+        self.stored_bytes = 0
+        self.deduplicated_bytes = 0
+
+    @staticmethod
+    def _key(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def _chunks(self, data):
+        chunks = []
+        start = 0
+        position = 0
+        while position < len(data):
+            end = data.find(b"\n", position)
+            end = len(data) if end == -1 else end + 1
+            line = data[position:end]
+            position = end
+            if (hashlib.blake2b(line, digest_size=4).digest()[0] & self.chunk_mask) == 0 or position - start >= self.max_chunk:
+                chunks.append(data[start:position])
+                start = position
+        if start < len(data):
+            chunks.append(data[start:])
+        return chunks
+
+    def _spill_path(self, key):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="jarvis-blobs-")
+            self.owns_spill_dir = True
+        os.makedirs(self.spill_dir, exist_ok=True)
+        return os.path.join(self.spill_dir, key)
+
+    def _evict(self):
+        while self.memory_bytes > self.max_memory and len(self.memory) > 1:
+            key, data = self.memory.popitem(last=False)
+            self.memory_bytes -= len(data)
+            try:
+                with open(self._spill_path(key), "wb") as f:
+                    f.write(data)
+                self.spilled[key] = len(data)
+            except OSError as e:
+                # Keep it in memory rather than lose it
+                print(f"⚠️ Blob spill failed: {e}")
+                self.memory[key] = data
+                self.memory_bytes += len(data)
+                return
+
+    def put(self, text):
+        """Store text, returns a BlobRef. Chunks already stored are not stored again"""
+        data = text.encode("utf-8")
+        keys = []
+        with self.lock:
+            for chunk in self._chunks(data):
+                key = self._key(chunk)
+                keys.append(key)
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    self.deduplicated_bytes += len(chunk)
+                elif key in self.spilled:
+                    self.deduplicated_bytes += len(chunk)
+                else:
+                    self.memory[key] = chunk
+                    self.memory_bytes += len(chunk)
+                    self.stored_bytes += len(chunk)
+            self._evict()
+        return BlobRef(tuple(keys), len(text), text[:self.preview_chars])
+
+    def _read_chunk(self, key):
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory.move_to_end(key)
+            return data
+        # Spilled chunks are mapped rather than reloaded, memory stays bounded
+        with open(self._spill_path(key), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[:]
+
+    def get(self, ref):
+        """Full text of a BlobRef"""
+        with self.lock:
+            return b"".join(self._read_chunk(key) for key in ref.keys).decode("utf-8")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "chunks": len(self.memory) + len(self.spilled),
+                "memory_bytes": self.memory_bytes,
+                "spilled_bytes": sum(self.spilled.values()),
+                "stored_bytes": self.stored_bytes,
+                "deduplicated_bytes": self.deduplicated_bytes
+            }
+
+    def close(self):
+        """Remove the spill directory if this store created it"""
+        with self.lock:
+            if self.owns_spill_dir and self.spill_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spilled.clear()
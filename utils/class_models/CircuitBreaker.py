@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name, failure_threshold=3, cooldown=30.0, slow_call_threshold=10.0,
+                 default_timeout=30.0, min_timeout=3.0, max_timeout=30.0,
+                 window=50, min_samples=5, ewma_alpha=0.3, timeout_multiplier=2.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.slow_call_threshold = slow_call_threshold
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.ewma_alpha = ewma_alpha
+        self.timeout_multiplier = timeout_multiplier
+
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0
+        self.probe_in_flight = False
+
+        # Recent successful call latencies in seconds
+        self.latencies = deque(maxlen=window)
+        self.ewma = None
+
+    def _transition(self, new_state, reason):
+        if new_state == self.state:
+            return
+        print(f"⚡ {self.name} circuit breaker {self.state} → {new_state} ({reason})")
+        self.state = new_state
+        if new_state == self.OPEN:
+            self.opened_at = time.time()
+            self.probe_in_flight = False
+        elif new_state == self.CLOSED:
+            self.consecutive_failures = 0
+            self.probe_in_flight = False
+
+    def allow_request(self):
+        """Whether a call may go through; lets one probe through once the cooldown expires"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    return False
+                self._transition(self.HALF_OPEN, f"cooldown of {self.cooldown:.0f}s elapsed")
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+
+    def release(self):
+        """Give back a half-open probe slot when no call was actually made"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record_success(self, latency, response_time=None):
+        """Record a finished call; response_time (e.g. time to first token) is judged
+        against the slow call threshold instead of the total latency when given"""
+        with self.lock:
+            self.latencies.append(latency)
+            if self.ewma is None:
+                self.ewma = latency
+            else:
+                self.ewma = self.ewma_alpha * latency + (1 - self.ewma_alpha) * self.ewma
+
+            # Slow answers are as bad as failures for a tier that exists to be fast,
+            # but a long answer streaming at a normal rate is not a slow one
+            response_time = latency if response_time is None else response_time
+            if response_time > self.slow_call_threshold:
+                self._record_failure(f"slow call {response_time:.2f}s")
+                return
+
+            self.consecutive_failures = 0
+            if self.state == self.HALF_OPEN:
+                self._transition(self.CLOSED, "probe succeeded")
+
+    def record_failure(self, reason="call failed"):
+        with self.lock:
+            self._record_failure(reason)
+
+    def _record_failure(self, reason):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN:
+            self._transition(self.OPEN, f"probe failed: {reason}")
+        elif self.consecutive_failures >= self.failure_threshold:
+            self._transition(self.OPEN, f"{self.consecutive_failures} consecutive failures, last: {reason}")
+
+    def percentile(self, p):
+        """Latency percentile (0-100) over the recent window, None without samples"""
+        with self.lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def timeout(self):
+        """Per-request timeout derived from latency history"""
+        if len(self.latencies) < self.min_samples:
+            return self.default_timeout
+        p95 = self.percentile(95)
+        derived = max(p95, self.ewma) * self.timeout_multiplier
+        return min(self.max_timeout, max(self.min_timeout, derived))
+
+    def describe(self):
+        """One-line state summary for the timing output"""
+        if self.ewma is None:
+            return f"{self.state} (no samples, timeout {self.timeout():.1f}s)"
+        return (f"{self.state} (EWMA {self.ewma:.2f}s, p50 {self.percentile(50):.2f}s, "
+                f"p95 {self.percentile(95):.2f}s, timeout {self.timeout():.1f}s)")
@@ -0,0 +1,146 @@
+import re
+import threading
+from collections import OrderedDict
+from utils.class_models.BlobStore import BlobRef
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+class ContextBuilder:
+    """Fits conversation history into a per-backend token budget.
+
+    Recent turns are kept verbatim. Older turns are folded into a short
+    extractive summary that is carried after the system prompt. Folding happens
+    in blocks down to a low watermark, so the prompt prefix stays byte-stable
+    for several turns instead of shifting every turn.
+
+    Message bodies may be BlobRefs into blob_store. Their size and preview are
+    enough for budgeting and summaries; only the verbatim window is loaded.
+    """
+
+    def __init__(self, budgets, default_budget=6000, keep_recent=2, summary_max_tokens=400,
+                 summary_line_chars=160, low_watermark=0.6, max_sessions=32, blob_store=None):
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.keep_recent = keep_recent
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_line_chars = summary_line_chars
+        self.low_watermark = low_watermark
+        self.max_sessions = max_sessions
+        self.blob_store = blob_store
+
+        self.lock = threading.Lock()
+        self.sessions = OrderedDict()
+        self.last_stats = {}
+
+    @staticmethod
+    def estimate_tokens(text):
+        """Rough token count, about four characters per token for English"""
+        return len(text) // 4 + 1 if text else 0
+
+    def message_tokens(self, message):
+        # Role markers and separators cost a few tokens per message
+        return self.estimate_tokens(message["content"]) + 4
+
+    def _session(self, key, history):
+        state = self.sessions.get(key)
+        # A cleared or replaced history no longer starts with what was folded
+        if state and (state["folded"] > len(history) or
+                      (state["folded"] and history[state["folded"] - 1] is not state["anchor"])):
+            state = None
+        if state is None:
+            state = {"folded": 0, "anchor": None, "summary_lines": []}
+        self.sessions[key] = state
+        self.sessions.move_to_end(key)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        return state
+
+    def _summarize_message(self, message):
+        content = message["content"]
+        text = " ".join((content.preview if isinstance(content, BlobRef) else content).split())
+        first_sentence = SENTENCE_END.split(text, maxsplit=1)[0]
+        if len(first_sentence) > self.summary_line_chars:
+            first_sentence = first_sentence[:self.summary_line_chars].rstrip() + "..."
+        speaker = "User" if message["role"] == "user" else "Jarvis"
+        return f"- {speaker}: {first_sentence}"
+
+    def _fold(self, state, messages):
+        for message in messages:
+            state["summary_lines"].append(self._summarize_message(message))
+        # Oldest summary lines go first once the summary itself is over budget
+        while (len(state["summary_lines"]) > 1 and
+               self.estimate_tokens("\n".join(state["summary_lines"])) > self.summary_max_tokens):
+            state["summary_lines"].pop(0)
+
+    def summary(self, state):
+        if not state["summary_lines"]:
+            return ""
+        return "Summary of earlier conversation:\n" + "\n".join(state["summary_lines"])
+
+    def build(self, history, backend, system_prompt, key=None):
+        """Return (system_parts, messages, stats) fitted to the backend budget.
+
+        system_parts is [system_prompt] or [system_prompt, summary], kept apart
+        so the unchanging system prompt can be cached on its own.
+
+        history must end with the current question. key identifies the
+        conversation when history is a temporary copy of it.
+        """
+        budget = self.budgets.get(backend, self.default_budget)
+        key = id(history) if key is None else key
+
+        with self.lock:
+            # Each backend folds at its own budget
+            state = self._session((key, backend), history)
+            window = history[state["folded"]:]
+            window_tokens = [self.message_tokens(m) for m in window]
+            available = budget - self.estimate_tokens(system_prompt) - self.summary_max_tokens
+
+            if sum(window_tokens) > available:
+                total = sum(window_tokens)
+                target = available * self.low_watermark
+                fold = 0
+                while fold < len(window) - self.keep_recent and total > target:
+                    total -= window_tokens[fold]
+                    fold += 1
+                # The verbatim part has to open with a user turn
+                while fold < len(window) - 1 and window[fold]["role"] != "user":
+                    total -= window_tokens[fold]
+                    fold += 1
+                if fold:
+                    self._fold(state, window[:fold])
+                    state["folded"] += fold
+                    state["anchor"] = history[state["folded"] - 1]
+                    window = window[fold:]
+                    window_tokens = window_tokens[fold:]
+
+            summary = self.summary(state)
+            system_parts = [system_prompt, summary] if summary else [system_prompt]
+            stats = {
+                "backend": backend,
+                "prompt_tokens": sum(self.estimate_tokens(part) for part in system_parts) + sum(window_tokens),
+                "history_tokens": self.estimate_tokens(system_prompt) + sum(self.message_tokens(m) for m in history),
+                "verbatim_messages": len(window),
+                "summarized_messages": state["folded"]
+            }
+            self.last_stats[backend] = stats
+
+        return system_parts, [{"role": m["role"], "content": self.materialize(m["content"])} for m in window], stats
+
+    def materialize(self, content):
+        """Full text of a message body, loading it from the blob store if needed"""
+        if isinstance(content, BlobRef):
+            return self.blob_store.get(content)
+        return content
+
+    def folded_count(self, key):
+        """Most messages any backend has folded into its summary for this conversation"""
+        with self.lock:
+            return max((state["folded"] for (session_key, _), state in self.sessions.items()
+                        if session_key == key), default=0)
+
+    @staticmethod
+    def describe(stats):
+        """One-line prompt size summary for the timing output"""
+        return (f"~{stats['prompt_tokens']} (full history ~{stats['history_tokens']}, "
+                f"{stats['verbatim_messages']} verbatim, {stats['summarized_messages']} summarized)")
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+# JarvisApp appends "YYYY-MM-DD HH-MM-SS" to every question
+TIMESTAMP_PATTERN = re.compile(r"\s*\d{4}-\d{2}-\d{2} \d{2}-\d{2}-\d{2}\s*$")
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#']+")
+
+DEFAULT_LOG_PATH = "~/.cache/jarvis/routing_log.jsonl"
+DEFAULT_MODEL_PATH = "~/.cache/jarvis/router_model.npz"
+DEFAULT_DIMENSIONS = 2 ** 14
+
+def strip_timestamp(question):
+    return TIMESTAMP_PATTERN.sub("", question)
+
+def hashed_features(question, dimensions=DEFAULT_DIMENSIONS):
+    """Hashed unigram and bigram buckets, crc32 so models survive restarts"""
+    tokens = TOKEN_PATTERN.findall(strip_timestamp(question).lower())
+    grams = [f"1:{token}" for token in tokens]
+    grams += [f"2:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    # Coarse length signal, long questions escalate more often
+    grams.append(f"len:{min(len(tokens) // 5, 8)}")
+    return sorted({zlib.crc32(gram.encode("utf-8")) % dimensions for gram in grams})
+
+class RoutingLog:
+    """JSONL log of routing decisions and their outcomes, rolled over to path.1 .. path.N at max_bytes.
+
+    Questions are stored as their hashed feature buckets, which is all the
+    router trains on, so the log never holds what was asked.
+    """
+
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.lock = threading.Lock()
+
+    def record(self, **fields):
+        fields.setdefault("time", time.time())
+        line = json.dumps(fields) + "\n"
+        try:
+            with self.lock:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line.encode("utf-8")) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            print(f"⚠️ Routing log write failed: {e}")
+
+    def _rotate(self):
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{index}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    @staticmethod
+    def load(path):
+        """Records from the log and its rolled over backups, oldest first"""
+        backups = []
+        index = 1
+        while os.path.exists(f"{path}.{index}"):
+            backups.append(f"{path}.{index}")
+            index += 1
+        records = []
+        for file_path in reversed(backups + [path]):
+            if not os.path.exists(file_path):
+                continue
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        records.append(json.loads(line))
+        return records
+
+class EscalationRouter:
+    """Logistic regression over hashed word n-grams predicting whether Ollama will escalate"""
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+        self.weights = None
+        self.bias = 0.0
+        # Time of the newest logged turn the model was trained on
+        self.trained_until = 0.0
+
+    def feature_indices(self, question):
+        return hashed_features(question, self.dimensions)
+
+    def _matrix(self, feature_rows):
+        import numpy as np
+        features = np.zeros((len(feature_rows), self.dimensions), dtype=np.float32)
+        for row, indices in enumerate(feature_rows):
+            features[row, indices] = 1.0
+        return features
+
+    def fit(self, feature_rows, labels, epochs=300, learning_rate=0.5, l2=1e-4):
+        """Train on hashed_features rows, labeled by whether the local model escalated"""
+        import numpy as np
+        features = self._matrix(feature_rows)
+        targets = np.asarray(labels, dtype=np.float32)
+        self.weights = np.zeros(self.dimensions, dtype=np.float32)
+        self.bias = 0.0
+
+        for _ in range(epochs):
+            predictions = 1 / (1 + np.exp(-(features @ self.weights + self.bias)))
+            error = predictions - targets
+            self.weights -= learning_rate * (features.T @ error / len(targets) + l2 * self.weights)
+            self.bias -= learning_rate * float(error.mean())
+        return self
+
+    def predict_proba(self, question):
+        """Probability that the local model would escalate this question"""
+        return self.predict_features(self.feature_indices(question))
+
+    def predict_features(self, indices):
+        if self.weights is None:
+            return None
+        import numpy as np
+        score = float(self.weights[indices].sum()) + self.bias
+        return float(1 / (1 + np.exp(-score)))
+
+    def save(self, path):
+        import numpy as np
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, dimensions=self.dimensions,
+                            trained_until=self.trained_until)
+
+    @classmethod
+    def load(cls, path):
+        """Load a trained model, None if there is none or NumPy is missing"""
+        if not os.path.exists(path):
+            return None
+        try:
+            import numpy as np
+            with np.load(path) as data:
+                router = cls(int(data["dimensions"]))
+                router.weights = data["weights"]
+                router.bias = float(data["bias"])
+                if "trained_until" in data:
+                    router.trained_until = float(data["trained_until"])
+            return router
+        except Exception as e:
+            print(f"⚠️ Could not load router model from {path}: {e}")
+            return None
+
+def labeled_examples(records, dimensions=DEFAULT_DIMENSIONS):
+    """Turns where Ollama was actually tried, labeled by whether it escalated"""
+    return [r for r in records
+            if r.get("ollama_escalated") is not None and r.get("features") is not None
+            and r.get("dimensions", DEFAULT_DIMENSIONS) == dimensions]
+
+def split_holdout(records, holdout):
+    """(training, held out) records, the newest `holdout` fraction is held out"""
+    records = sorted(records, key=lambda r: r.get("time", 0.0))
+    held_out = int(round(len(records) * holdout))
+    return records[:len(records) - held_out], records[len(records) - held_out:]
+
+def evaluate(router, records, threshold):
+    """Replay logged turns and estimate latency saved by routing on predictions"""
+    examples = labeled_examples(records, router.dimensions)
+    cloud_latencies = [r["cloud_latency"] for r in records if r.get("cloud_latency")]
+    average_cloud = sum(cloud_latencies) / len(cloud_latencies) if cloud_latencies else 0.0
+
+    counts = {"tp": 0, "fp": 0, "tn": 0, "fn": 0}
+    saved = 0.0
+    cost = 0.0
+    keyword_saved = 0.0
+    for record in examples:
+        probability = router.predict_features(record["features"])
+        predicted = probability >= threshold
+        actual = record["ollama_escalated"]
+        local_latency = record.get("ollama_latency") or 0.0
+        if predicted and actual:
+            counts["tp"] += 1
+            # The wasted local round trip is skipped
+            saved += local_latency
+        elif predicted:
+            counts["fp"] += 1
+            # A good local answer is replaced by a cloud call
+            cost += max(0.0, average_cloud - local_latency)
+        elif actual:
+            counts["fn"] += 1
+        else:
+            counts["tn"] += 1
+        if actual and record.get("keyword_hit"):
+            keyword_saved += local_latency
+
+    total = len(examples)
+    precision = counts["tp"] / max(1, counts["tp"] + counts["fp"])
+    recall = counts["tp"] / max(1, counts["tp"] + counts["fn"])
+    print(f"📊 Router evaluation on {total} replayed turns (threshold {threshold:.2f})")
+    print(f"   Accuracy: {(counts['tp'] + counts['tn']) / max(1, total):.2%}")
+    print(f"   Precision: {precision:.2%}  Recall: {recall:.2%}")
+    print(f"   Confusion: {counts}")
+    print(f"   Local latency saved: {saved:.2f}s")
+    print(f"   Added cloud latency from false positives: {cost:.2f}s")
+    print(f"   Net predicted latency saved: {saved - cost:.2f}s ({(saved - cost) / max(1, total):.2f}s per turn)")
+    print(f"   Keyword list alone would have saved: {keyword_saved:.2f}s")
+    return counts, saved - cost
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the learned local-vs-cloud router")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--log", default=os.environ.get("ROUTER_LOG", DEFAULT_LOG_PATH), help="routing log to train on or replay")
+    parser.add_argument("--model", default=os.environ.get("ROUTER_MODEL", DEFAULT_MODEL_PATH), help="where the model is stored")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("ROUTER_THRESHOLD", "0.8")))
+    parser.add_argument("--holdout", type=float, default=0.2, help="newest fraction of turns kept out of training")
+    parser.add_argument("--all", action="store_true", help="evaluate on every logged turn, including those trained on")
+    args = parser.parse_args()
+    args.log = os.path.expanduser(args.log)
+    args.model = os.path.expanduser(args.model)
+
+    if not os.path.exists(args.log):
+        print(f"❌ No routing log at {args.log}, set ROUTER_LOGGING=true to collect one")
+        return
+    records = RoutingLog.load(args.log)
+    if args.command == "train":
+        training, held_out = split_holdout(labeled_examples(records), args.holdout)
+        if not training:
+            print(f"❌ No turns in {args.log} where the local model was tried")
+            return
+        router = EscalationRouter().fit([r["features"] for r in training], [r["ollama_escalated"] for r in training])
+        router.trained_until = training[-1].get("time", 0.0)
+        router.save(args.model)
+        print(f"✅ Trained on {len(training)} turns, model saved to {args.model}")
+        records = held_out
+    else:
+        router = EscalationRouter.load(args.model)
+        if router is None:
+            print(f"❌ No router model at {args.model}, run 'train' first")
+            return
+        if not args.all:
+            # Turns logged after training, scoring the rest would measure how well it memorized them
+            records = [r for r in records if r.get("time", 0.0) > router.trained_until]
+
+    if not labeled_examples(records, router.dimensions):
+        print("⚠️ No held out turns to evaluate on, log more turns or pass --all")
+        return
+    evaluate(router, records, args.threshold)
+
+if __name__ == "__main__":
+    main()
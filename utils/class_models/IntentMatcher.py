@@ -0,0 +1,93 @@
+import threading
+from collections import deque
+
+class IntentMatcher:
+    """Aho-Corasick automaton that finds every registered phrase in one pass.
+
+    Phrases must start on a word boundary, so "fix" no longer fires inside
+    "prefix" and "git" inside "digit". Phrases registered with whole_word=True
+    must also end on one. Phrases that start or end with punctuation (e.g. "?")
+    carry no boundary on that side.
+    """
+
+    def __init__(self):
+        self.phrases = {}  # (intent, phrase) -> whole_word
+        self.lock = threading.Lock()
+        self.dirty = True
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+    def add_phrases(self, intent, phrases, whole_word=False):
+        """Register phrases for an intent, re-registering the same phrase is a no-op"""
+        with self.lock:
+            for phrase in phrases:
+                phrase = phrase.lower().strip()
+                if phrase and (intent, phrase) not in self.phrases:
+                    self.phrases[(intent, phrase)] = whole_word
+                    self.dirty = True
+
+    def _build(self):
+        goto = [{}]
+        fail = [0]
+        output = [[]]
+
+        for (intent, phrase), whole_word in self.phrases.items():
+            node = 0
+            for char in phrase:
+                if char not in goto[node]:
+                    goto.append({})
+                    fail.append(0)
+                    output.append([])
+                    goto[node][char] = len(goto) - 1
+                node = goto[node][char]
+            output[node].append((intent, phrase, whole_word))
+
+        # Breadth-first pass to wire failure links and merge outputs
+        pending = deque(goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in goto[node].items():
+                pending.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                output[child] = output[child] + output[fail[child]]
+
+        self.goto, self.fail, self.output = goto, fail, output
+        self.dirty = False
+
+    @staticmethod
+    def _is_word_char(char):
+        return char.isalnum() or char == "_"
+
+    def _on_boundary(self, text, start, end, phrase, whole_word):
+        if self._is_word_char(phrase[0]) and start > 0 and self._is_word_char(text[start - 1]):
+            return False
+        if whole_word and self._is_word_char(phrase[-1]) and end < len(text) and self._is_word_char(text[end]):
+            return False
+        return True
+
+    def classify(self, text):
+        """Return {intent: [matched phrases]} for every intent found in text"""
+        with self.lock:
+            if self.dirty:
+                self._build()
+            goto, fail, output = self.goto, self.fail, self.output
+
+        text = text.lower()
+        intents = {}
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for intent, phrase, whole_word in output[node]:
+                end = index + 1
+                start = end - len(phrase)
+                if self._on_boundary(text, start, end, phrase, whole_word):
+                    matched = intents.setdefault(intent, [])
+                    if phrase not in matched:
+                        matched.append(phrase)
+        return intents
@@ -0,0 +1,311 @@
+import asyncio
+import hmac
+import json
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import WSMsgType, web
+from utils import utils
+from utils.class_models.AssistantCore import AssistantCore, Turn, stream_chunks
+from utils.class_models.Tracer import tracer
+
+class Session:
+    """One client's conversation: its history and the turns answering on it"""
+
+    def __init__(self, session_id, concurrency=1):
+        self.id = session_id
+        self.concurrency = concurrency
+        self.history = []
+        self.turns = set()
+        # Turns take the history one at a time, concurrency only bounds how many may queue
+        self.lock = asyncio.Lock()
+        self.created = time.time()
+        self.last_used = self.created
+
+    def touch(self):
+        self.last_used = time.time()
+
+    def busy(self):
+        return len(self.turns) >= self.concurrency
+
+    def idle_for(self):
+        return 0.0 if self.turns else time.time() - self.last_used
+
+    def cancel(self):
+        """Abort every turn in progress, their model calls stop at the next chunk"""
+        for turn in self.turns:
+            turn.cancel_event.set()
+
+    def describe(self):
+        return {
+            "session": self.id,
+            "messages": len(self.history),
+            "active_turns": len(self.turns),
+            "idle_seconds": round(self.idle_for(), 1)
+        }
+
+def error(exception_class, message):
+    """aiohttp HTTP error with a JSON body"""
+    return exception_class(text=json.dumps({"error": message}), content_type="application/json")
+
+class JarvisServer:
+    """HTTP and WebSocket front end answering many conversations from one process.
+
+    Each session keeps its own history; the Ollama connection pool, the cloud
+    SDK client, the response cache and the router model are the module-level
+    ones in utils.py and are shared by every session. Follow-ups and questions
+    about the user are cached with the session's last exchange in the key, so
+    only self-contained answers pass between sessions. Answers stream from
+    ask_question_memory_stream on a shared worker pool, so a slow model call
+    never blocks the event loop. A session holds at most `concurrency`
+    questions, answered one after another so its history stays in order;
+    further questions are refused until one finishes.
+
+    Nothing here loads Whisper or the audio mixer, clients only exchange text.
+    """
+
+    def __init__(self, max_sessions=100, session_ttl=1800, session_concurrency=1, workers=16, token=None):
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.session_concurrency = session_concurrency
+        self.token = token
+        self.sessions = OrderedDict()
+        # Each streaming turn holds a worker while its model call runs
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="server")
+        self.loop = None
+        self.pruner = None
+
+        # Summaries are kept per conversation and backend, leave room for every session
+        builder = utils.context_builder
+        builder.max_sessions = max(builder.max_sessions, max_sessions * len(utils.CONTEXT_BUDGETS))
+
+        self.app = web.Application(middlewares=[self.authorize])
+        self.app.router.add_get("/health", self.health)
+        self.app.router.add_post("/sessions", self.open_session)
+        self.app.router.add_get("/sessions/{session}", self.session_info)
+        self.app.router.add_delete("/sessions/{session}", self.close_session)
+        self.app.router.add_post("/sessions/{session}/ask", self.ask)
+        self.app.router.add_get("/ws", self.websocket)
+        self.app.on_startup.append(self.on_startup)
+        self.app.on_cleanup.append(self.on_cleanup)
+
+    @web.middleware
+    async def authorize(self, request, handler):
+        """With a token configured, every request but /health needs it as a Bearer header or ?token="""
+        if self.token and request.path != "/health":
+            header = request.headers.get("Authorization", "")
+            supplied = header[7:] if header.startswith("Bearer ") else request.query.get("token", "")
+            if not hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8")):
+                raise error(web.HTTPUnauthorized, "missing or wrong token")
+        return await handler(request)
+
+    def create_session(self):
+        self.prune()
+        if len(self.sessions) >= self.max_sessions:
+            # Make room by dropping the least recently used idle session
+            idle = next((session for session in self.sessions.values() if not session.turns), None)
+            if idle is None:
+                raise error(web.HTTPServiceUnavailable, "too many active sessions")
+            self.drop_session(idle)
+        session = Session(uuid.uuid4().hex, self.session_concurrency)
+        self.sessions[session.id] = session
+        return session
+
+    def get_session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise error(web.HTTPNotFound, "unknown or expired session")
+        self.sessions.move_to_end(session_id)
+        session.touch()
+        return session
+
+    def drop_session(self, session):
+        session.cancel()
+        self.sessions.pop(session.id, None)
+
+    def prune(self):
+        """Drop sessions idle for longer than the session TTL"""
+        expired = [session for session in self.sessions.values() if session.idle_for() > self.session_ttl]
+        for session in expired:
+            self.drop_session(session)
+        if expired:
+            print(f"🧹 Expired {len(expired)} idle sessions, {len(self.sessions)} left")
+
+    async def prune_loop(self):
+        while True:
+            await asyncio.sleep(min(60.0, self.session_ttl))
+            self.prune()
+
+    def start_turn(self, session, question):
+        """Reserve a turn on the session, refused while it is at its concurrency limit"""
+        if session.busy():
+            raise error(web.HTTPTooManyRequests, "session has too many questions in flight")
+        turn = Turn(question)
+        session.turns.add(turn)
+        session.touch()
+        return turn
+
+    def end_turn(self, session, turn):
+        session.turns.discard(turn)
+        session.touch()
+
+    async def answer(self, session, turn, send=None):
+        """Answer a started turn into the session's history, passing each chunk to send. Returns the answer"""
+        async with session.lock:
+            if turn.cancelled:
+                # Cancelled while queued behind another turn
+                return ""
+            try:
+                with tracer.turn(mode="server", session=session.id) as span:
+                    question = turn.utterance + " " + time.strftime("%Y-%m-%d %H-%M-%S")
+                    chunks = utils.ask_question_memory_stream(question, session.history, cancel_event=turn.cancel_event)
+                    async for chunk in stream_chunks(self.loop, self.executor, chunks, turn):
+                        if send is not None:
+                            await send(chunk)
+                    span["action"] = "cancelled" if turn.cancelled else "answer"
+            except BaseException:
+                # A dropped client or cancelled request stops the model call as well
+                turn.cancel_event.set()
+                raise
+            finally:
+                # The stream records the exchange in the history as it unwinds, before the next turn reads it
+                await turn.wait_for_pumps(AssistantCore.PUMP_STOP_TIMEOUT)
+        return turn.response_text()
+
+    @staticmethod
+    async def read_question(request):
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise error(web.HTTPBadRequest, "body must be JSON")
+        question = str(body.get("question") or "").strip() if isinstance(body, dict) else ""
+        if not question:
+            raise error(web.HTTPBadRequest, "question is required")
+        return question, bool(body.get("stream", False))
+
+    async def health(self, request):
+        return web.json_response({
+            "status": "ok",
+            "sessions": len(self.sessions),
+            "active_turns": sum(len(session.turns) for session in self.sessions.values()),
+            "ollama_healthy": utils.ollama_client.is_healthy(),
+            "response_cache": utils.response_cache.describe() if utils.RESPONSE_CACHE else None
+        })
+
+    async def open_session(self, request):
+        session = self.create_session()
+        return web.json_response(session.describe(), status=201)
+
+    async def session_info(self, request):
+        return web.json_response(self.get_session(request.match_info["session"]).describe())
+
+    async def close_session(self, request):
+        self.drop_session(self.get_session(request.match_info["session"]))
+        return web.Response(status=204)
+
+    async def ask(self, request):
+        """One question; the whole answer as JSON, or NDJSON chunks with "stream": true"""
+        session = self.get_session(request.match_info["session"])
+        question, stream = await self.read_question(request)
+        turn = self.start_turn(session, question)
+        try:
+            if not stream:
+                answer = await self.answer(session, turn)
+                return web.json_response({"session": session.id, "answer": answer})
+
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+
+            async def send_line(payload):
+                await response.write((json.dumps(payload) + "\n").encode("utf-8"))
+
+            try:
+                answer = await self.answer(session, turn, lambda chunk: send_line({"text": chunk}))
+                await send_line({"done": True, "answer": answer})
+                await response.write_eof()
+            except ConnectionError:
+                # The client went away mid-answer
+                pass
+            return response
+        finally:
+            self.end_turn(session, turn)
+
+    async def websocket(self, request):
+        """Session over a WebSocket: {"question": ...} streams chunks back, {"type": "cancel"} stops the answer"""
+        session_id = request.query.get("session")
+        session = self.get_session(session_id) if session_id else self.create_session()
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        await ws.send_json({"type": "session", "session": session.id})
+
+        tasks = set()
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json.loads(message.data)
+                except json.JSONDecodeError:
+                    await ws.send_json({"type": "error", "error": "messages must be JSON"})
+                    continue
+                if not isinstance(data, dict):
+                    await ws.send_json({"type": "error", "error": "messages must be JSON objects"})
+                    continue
+                if data.get("type") == "cancel":
+                    session.cancel()
+                    continue
+                question = str(data.get("question") or "").strip()
+                if not question:
+                    await ws.send_json({"type": "error", "error": "question is required"})
+                    continue
+                if session.busy():
+                    await ws.send_json({"type": "error", "error": "session has too many questions in flight"})
+                    continue
+                # Answered on its own task so cancel messages are still read meanwhile
+                task = asyncio.create_task(self.answer_websocket(ws, session, self.start_turn(session, question)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return ws
+
+    async def answer_websocket(self, ws, session, turn):
+        try:
+            answer = await self.answer(session, turn, lambda chunk: ws.send_json({"type": "chunk", "text": chunk}))
+            await ws.send_json({"type": "done", "answer": answer, "cancelled": turn.cancelled})
+        except ConnectionError:
+            # The client went away mid-answer
+            pass
+        except Exception as e:
+            print(f"💥 Error answering session {session.id}: {e}")
+            if not ws.closed:
+                await ws.send_json({"type": "error", "error": str(e)})
+        finally:
+            self.end_turn(session, turn)
+
+    async def on_startup(self, app):
+        self.loop = asyncio.get_running_loop()
+        self.pruner = asyncio.create_task(self.prune_loop())
+
+    async def on_cleanup(self, app):
+        print("\nShutting down...")
+        self.pruner.cancel()
+        for session in list(self.sessions.values()):
+            self.drop_session(session)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        utils.blob_store.close()
+        tracer.close()
+        if utils.RESPONSE_CACHE:
+            print(f"💾 Response cache: {utils.response_cache.describe()}")
+
+    def run(self, host="127.0.0.1", port=8765):
+        """Serve until Ctrl+C"""
+        # Only the shared backends, the server has no microphone or speakers
+        utils.start_backends()
+        utils.warm_up_ollama()
+        if not self.token and host not in ("127.0.0.1", "localhost", "::1"):
+            print(f"⚠️ Listening on {host} without SERVER_TOKEN, anyone who can reach it can use your API keys")
+        print(f"🌐 Jarvis server listening on http://{host}:{port}")
+        web.run_app(self.app, host=host, port=port, print=None)
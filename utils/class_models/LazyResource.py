@@ -0,0 +1,59 @@
+import threading
+from utils.class_models.StartupProfiler import startup_profiler
+
+class LazyResource:
+    """A value built once by a factory, either on a background thread or on first use.
+
+    start() begins building in the background so startup does not wait for it.
+    get() returns the value, waiting only if it is still being built, and
+    builds it inline if start() was never called. A factory that raises
+    leaves the error to be raised again by every get().
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.started = False
+        self.value = None
+        self.error = None
+
+    def _build(self):
+        try:
+            with startup_profiler.step(self.name):
+                self.value = self.factory()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def _claim(self):
+        with self.lock:
+            if self.started:
+                return False
+            self.started = True
+            return True
+
+    def start(self):
+        """Build in the background, returns immediately"""
+        if self._claim():
+            threading.Thread(target=self._build, name=f"init-{self.name}", daemon=True).start()
+        return self
+
+    def get(self):
+        if self._claim():
+            self._build()
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def is_ready(self):
+        return self.done.is_set()
+
+    def peek(self):
+        """The value if it is already built, never waits or builds"""
+        if self.done.is_set() and self.error is None:
+            return self.value
+        return None
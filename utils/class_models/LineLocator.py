@@ -0,0 +1,107 @@
+import statistics
+
+# Gutters only hold line numbers
+GUTTER_CONFIG = "--psm 6 -c tessedit_char_whitelist=0123456789"
+
+class LineLocator:
+    """Finds a range of editor lines on screen from the line-number gutter.
+
+    The first lookup OCRs a strip along the left edge of the frame, digits
+    only, and looks for a column of right-aligned increasing integers, the
+    editor gutter; the strip is widened once for editors behind a side bar.
+    Later lookups only OCR the gutter itself to find where the requested
+    lines are so just they can be cropped and OCR'd. Nothing here reads the
+    whole frame, without a gutter the caller falls back to a full capture.
+    """
+
+    def __init__(self, ocr_engine, margin_lines=3, min_numbers=5, align_tolerance=8, gutter_padding=6,
+                 search_widths=(0.12, 0.35)):
+        self.ocr_engine = ocr_engine
+        self.margin_lines = margin_lines
+        self.min_numbers = min_numbers
+        self.align_tolerance = align_tolerance
+        self.gutter_padding = gutter_padding
+        # Left strips searched for the gutter, as fractions of the frame width
+        self.search_widths = search_widths
+        self.gutter = None  # (left, right) of the gutter in screenshot pixels
+
+    def _is_line_column(self, values):
+        increasing = sum(1 for a, b in zip(values, values[1:]) if b > a)
+        return len(values) >= self.min_numbers and increasing >= 0.8 * (len(values) - 1)
+
+    def find_gutter(self, words):
+        """x range of the longest right-aligned column of increasing integers, None if there is none"""
+        numbers = sorted((word for word in words if word["text"].isdigit()), key=lambda word: word["right"])
+        columns = []
+        for word in numbers:
+            if not columns or word["right"] - columns[-1][-1]["right"] > self.align_tolerance:
+                columns.append([])
+            columns[-1].append(word)
+
+        best = None
+        for column in columns:
+            column.sort(key=lambda word: word["top"])
+            if self._is_line_column([int(word["text"]) for word in column]):
+                if best is None or len(column) > len(best):
+                    best = column
+        if best is None:
+            return None
+        return (max(0, min(word["left"] for word in best) - self.gutter_padding),
+                max(word["right"] for word in best) + self.gutter_padding)
+
+    def search_gutter(self, image):
+        """Find the gutter in the narrowest left strip that holds one, None if none does"""
+        for fraction in self.search_widths:
+            strip = image.crop((0, 0, max(1, int(image.width * fraction)), image.height))
+            gutter = self.find_gutter(self.ocr_engine.read_words(strip, GUTTER_CONFIG))
+            if gutter is not None:
+                return gutter
+        return None
+
+    def read_gutter(self, image):
+        """[(line number, top, bottom)] down the gutter, None if it no longer looks like one"""
+        left, right = self.gutter
+        strip = image.crop((int(left), 0, min(image.width, int(right) + 1), image.height))
+        entries = [(int(word["text"]), word["top"], word["bottom"])
+                   for word in self.ocr_engine.read_words(strip, GUTTER_CONFIG) if word["text"].isdigit()]
+        entries.sort(key=lambda entry: entry[1])
+        if not self._is_line_column([entry[0] for entry in entries]):
+            return None
+        return entries
+
+    @staticmethod
+    def line_height(entries):
+        steps = [(b[1] - a[1]) / (b[0] - a[0]) for a, b in zip(entries, entries[1:]) if b[0] > a[0]]
+        return statistics.median(steps) if steps else entries[0][2] - entries[0][1]
+
+    @staticmethod
+    def line_top(entries, line, height):
+        """Top of a line, estimated from the nearest number the gutter OCR found"""
+        number, top, _ = min(entries, key=lambda entry: abs(entry[0] - line))
+        return top + (line - number) * height
+
+    def locate(self, image, start_line, end_line):
+        """Crop box covering the lines plus a margin, with the line range it covers, or None"""
+        entries = None
+        if self.gutter is not None:
+            entries = self.read_gutter(image)
+        if entries is None:
+            # First lookup, or the layout changed since the gutter was found
+            self.gutter = self.search_gutter(image)
+            if self.gutter is None:
+                return None
+            entries = self.read_gutter(image)
+            if entries is None:
+                return None
+
+        first = max(start_line - self.margin_lines, entries[0][0])
+        last = min(end_line + self.margin_lines, entries[-1][0])
+        if first > last:
+            # The requested lines are scrolled out of view
+            return None
+
+        height = self.line_height(entries)
+        top = self.line_top(entries, first, height) - height * 0.25
+        bottom = self.line_top(entries, last, height) + height * 1.25
+        box = (int(self.gutter[0]), max(0, int(top)), image.width, min(image.height, int(bottom)))
+        return box, first, last
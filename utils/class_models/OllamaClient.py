@@ -0,0 +1,99 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+class OllamaClient:
+    def __init__(self, base_url, health_interval=15.0, unhealthy_interval=3.0, pool_size=4):
+        self.base_url = base_url.rstrip("/")
+        self.health_interval = health_interval
+        self.unhealthy_interval = unhealthy_interval
+
+        # Keep-alive session so each turn reuses pooled TCP connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Optimistic until the first probe says otherwise, so a healthy
+        # server is never skipped while the prober is starting up
+        self.healthy = True
+        self.last_health_check = 0
+        self.stop_event = threading.Event()
+        self.prober = None
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def start(self):
+        """Start the background health prober"""
+        if self.prober and self.prober.is_alive():
+            return
+        self.stop_event.clear()
+        self.prober = threading.Thread(target=self._probe_loop, name="ollama-health", daemon=True)
+        self.prober.start()
+
+    def stop(self):
+        """Stop the prober and release pooled connections"""
+        self.stop_event.set()
+        if self.prober:
+            self.prober.join(timeout=2)
+        self.session.close()
+
+    def _probe_loop(self):
+        while True:
+            self.check_health()
+            # Probe an unhealthy server more often so recovery is noticed quickly
+            interval = self.health_interval if self.healthy else self.unhealthy_interval
+            if self.stop_event.wait(interval):
+                return
+
+    def check_health(self, timeout=2):
+        """Hit /api/tags once and update the cached health flag"""
+        try:
+            response = self.session.get(self.url("/api/tags"), timeout=timeout)
+            healthy = response.status_code == 200
+        except requests.exceptions.RequestException:
+            healthy = False
+        self.last_health_check = time.time()
+        self._set_healthy(healthy)
+        return healthy
+
+    def _set_healthy(self, healthy):
+        if healthy != self.healthy:
+            print("✅ Ollama is reachable" if healthy else f"🔌 Ollama unreachable at {self.base_url}")
+        self.healthy = healthy
+
+    def is_healthy(self):
+        """Cached health flag, no network traffic on the hot path"""
+        return self.healthy
+
+    def mark_healthy(self):
+        self._set_healthy(True)
+
+    def mark_unhealthy(self):
+        """Record a failed request so following turns skip Ollama until the prober recovers it"""
+        self._set_healthy(False)
+
+    def post(self, path, **kwargs):
+        return self.session.post(self.url(path), **kwargs)
+
+    def warm_up(self, model, messages, keep_alive, timeout=120):
+        """Load the model and evaluate messages without generating, returns load time in seconds or None"""
+        data = {
+            "model": model,
+            "messages": messages,
+            "stream": False,
+            "keep_alive": keep_alive,
+            # One token is enough to have the prompt evaluated into the KV cache
+            "options": {"num_predict": 1}
+        }
+        try:
+            response = self.post("/api/chat", json=data, timeout=timeout)
+            if response.status_code != 200:
+                print(f"⚠️ Ollama warm-up failed (Status: {response.status_code})")
+                return None
+            return response.json().get("load_duration", 0) / 1e9
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Ollama warm-up failed: {e}")
+            return None
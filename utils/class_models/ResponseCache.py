@@ -0,0 +1,75 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from utils.class_models.EscalationRouter import strip_timestamp
+
+APOSTROPHES = re.compile(r"['’]")
+# Keeps letters, digits and the punctuation that changes meaning in technical questions (c++, c#)
+SEPARATORS = re.compile(r"[^\w+#]+")
+
+class ResponseCache:
+    """LRU cache of answers to repeated questions, each entry with its own TTL.
+
+    Questions are normalized so "What's a closure?" asked a minute later
+    with a new timestamp finds the same entry. Callers add a context
+    fingerprint to the key when the answer depends on the conversation.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (answer, expires_at, latency), least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def normalize(question):
+        """Timestamp stripped, casefolded, punctuation and whitespace collapsed"""
+        text = APOSTROPHES.sub("", strip_timestamp(question).casefold())
+        return " ".join(SEPARATORS.sub(" ", text).split())
+
+    @staticmethod
+    def make_key(normalized, fingerprint=""):
+        return hashlib.sha256(f"{fingerprint}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """(answer, latency it originally took) or None, expired entries are dropped"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[2]
+            return entry[0], entry[2]
+
+    def put(self, key, answer, ttl, latency):
+        with self.lock:
+            self.entries[key] = (answer, time.time() + ttl, latency)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def bypass(self):
+        """Count a question that was not eligible for caching"""
+        with self.lock:
+            self.bypassed += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def describe(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            rate = self.hits / lookups if lookups else 0.0
+            return (f"{self.hits}/{lookups} hits ({rate:.0%}), {self.bypassed} bypassed, "
+                    f"~{self.saved_seconds:.1f}s saved, {len(self.entries)} entries")
@@ -1,46 +1,78 @@
+import difflib
+import threading
 import time
-import pyautogui
-import pytesseract
+from contextlib import contextmanager
 from utils import utils
+from utils.class_models.ScreenOCRCache import ScreenOCRCache
+from utils.class_models.ScreenOCREngine import ScreenOCREngine
+from utils.class_models.LineLocator import LineLocator
+from utils.class_models.ScreenPrefetcher import ScreenPrefetcher
+from utils.class_models.Tracer import tracer
 
 class ScreenMonitor:
+    # Fixed spoken phrases, pre-rendered into the speech cache at startup
+    NO_CAPTURE_RESPONSE = "I couldn't capture any code from your screen, Sir."
+    MONITORING_ENABLED_RESPONSE = "Screen monitoring enabled, Sir. I can now analyze your code when you ask. You can ask me to analyze, explain, debug, or review any code on your screen. You can also specify line numbers if needed."
+    MONITORING_DISABLED_RESPONSE = "Screen monitoring disabled, Sir."
+    SPOKEN_PHRASES = [NO_CAPTURE_RESPONSE, MONITORING_ENABLED_RESPONSE, MONITORING_DISABLED_RESPONSE]
+    
+    # Direct screen analysis requests
+    SCREEN_TRIGGERS = [
+        "analyze this code", "look at this code", "review this code", 
+        "explain this code", "debug this code", "check this code",
+        "what does this code do", "is this code correct", "fix this code",
+        "improve this code", "optimize this code", "refactor this code",
+        "look at line", "analyze line", "check line", "review line",
+        "what's wrong with this", "help me with this code", "thoughts on this code", 
+        "look at my code", "tell me about my current code", "tell me about the code on my screen",
+        "capture my screen", "look at my screen"
+    ]
+    
+    REQUEST_TYPE_WORDS = [
+        ("explain", ["explain", "what does", "what is"]),
+        ("debug", ["debug", "fix", "wrong", "error", "bug"]),
+        ("review", ["review", "check", "correct", "validate", "look"]),
+        ("suggest", ["improve", "optimize", "better", "refactor", "suggest"])
+    ]
+    
     def __init__(self):
+        # Screen vocabularies join the shared single-pass intent matcher
+        utils.intent_matcher.add_phrases("screen_analysis", self.SCREEN_TRIGGERS)
+        for request_type, words in self.REQUEST_TYPE_WORDS:
+            utils.intent_matcher.add_phrases(f"request_{request_type}", words)
+        
         self.monitoring = False
-        self.last_capture_time = 0
-        self.capture_cooldown = 2  # Prevent spam captures
+        # Repeat questions about an unchanged screen skip OCR instead of being refused
+        self.ocr_cache = ScreenOCRCache()
+        self.ocr_engine = ScreenOCREngine(
+            workers=utils.SCREEN_OCR_WORKERS,
+            scale=utils.SCREEN_OCR_SCALE,
+            binarize=utils.SCREEN_OCR_BINARIZE
+        )
+        self.line_locator = LineLocator(self.ocr_engine, margin_lines=utils.SCREEN_LINE_MARGIN)
+        # Last capture sent in full, later captures of the same kind can be sent as a diff against it
+        self.last_capture = None
+        self.capture_lock = threading.Lock()
+        # Set during user captures, background OCR gives way to them
+        self.foreground_capture = threading.Event()
+        self.prefetcher = None
         
-    def should_analyze_screen(self, text):
+    def should_analyze_screen(self, text, intents=None):
         """Determine if the user is asking for screen analysis"""
-        text_lower = text.lower()
-        
-        # Direct screen analysis requests
-        screen_triggers = [
-            "analyze this code", "look at this code", "review this code", 
-            "explain this code", "debug this code", "check this code",
-            "what does this code do", "is this code correct", "fix this code",
-            "improve this code", "optimize this code", "refactor this code",
-            "look at line", "analyze line", "check line", "review line",
-            "what's wrong with this", "help me with this code", "thoughts on this code", 
-            "look at my code", "tell me about my current code", "tell me about the code on my screen",
-            "capture my screen", "look at my screen"
-        ]
-        
-        return any(trigger in text_lower for trigger in screen_triggers)
+        if intents is None:
+            intents = utils.classify_intents(text)
+        return "screen_analysis" in intents
     
-    def detect_request_type(self, text):
+    def detect_request_type(self, text, intents=None):
         """Detect what type of analysis the user wants"""
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ["explain", "what does", "what is"]):
-            return "explain"
-        elif any(word in text_lower for word in ["debug", "fix", "wrong", "error", "bug"]):
-            return "debug"
-        elif any(word in text_lower for word in ["review", "check", "correct", "validate", "look"]):
-            return "review"
-        elif any(word in text_lower for word in ["improve", "optimize", "better", "refactor", "suggest"]):
-            return "suggest"
-        else:
-            return "analyze"
+        if intents is None:
+            intents = utils.classify_intents(text)
+        
+        # First matching type wins, in priority order
+        for request_type, _ in self.REQUEST_TYPE_WORDS:
+            if f"request_{request_type}" in intents:
+                return request_type
+        return "analyze"
     
     def extract_line_numbers(self, text):
         """Extract line number ranges from text like 'lines 345-380' or 'line 50'"""
@@ -61,28 +93,43 @@ class ScreenMonitor:
         
         return None, None
         
+    def grab_screen(self, region=None):
+        # Loaded on first capture rather than at startup
+        import pyautogui
+        if region:
+            return pyautogui.screenshot(region=region)
+        return pyautogui.screenshot()
+    
+    def prefetch_ocr(self, images):
+        """Background OCR, one band at a time at a lower CPU priority than foreground requests"""
+        return self.ocr_engine.ocr_bands(images, nice=utils.SCREEN_PREFETCH_NICE, parallel=False)
+    
+    @contextmanager
+    def foreground(self):
+        """Serialize user captures and stop background OCR while one runs"""
+        with self.capture_lock:
+            self.foreground_capture.set()
+            try:
+                yield
+            finally:
+                self.foreground_capture.clear()
+    
     def capture_screen(self, region=None):
         """Capture screen and extract text using OCR"""
         try:
-            # Add small delay to prevent accidental captures
-            current_time = time.time()
-            if current_time - self.last_capture_time < self.capture_cooldown:
-                print("🕐 Please wait before capturing again...")
-                return None
-                
-            self.last_capture_time = current_time
-            
             print("📸 Capturing screen...")
             
-            # Take screenshot
-            if region:
-                screenshot = pyautogui.screenshot(region=region)
-            else:
-                screenshot = pyautogui.screenshot()
-            
-            # Extract text using OCR
-            print("🔍 Extracting text from image...")
-            text = pytesseract.image_to_string(screenshot)
+            # An in-flight prefetch pass stops, the bands it already read are reused
+            with self.foreground():
+                # Take screenshot
+                screenshot = self.grab_screen(region)
+                
+                # Extract text using OCR, only for the parts of the screen that changed
+                print("🔍 Extracting text from image...")
+                with tracer.span("ocr", kind="screen") as span:
+                    text, ocr_stats = self.ocr_cache.extract(screenshot, self.ocr_engine.ocr_bands)
+                    span.update(bands=ocr_stats["bands"], ocr_bands=ocr_stats["ocr_bands"], unchanged=ocr_stats["unchanged"])
+            print(f"   {ScreenOCRCache.describe(ocr_stats)}")
             
             if not text.strip():
                 print("❌ No text found in captured area")
@@ -95,18 +142,94 @@ class ScreenMonitor:
             print(f"❌ Screen capture error: {e}")
             return None
     
-    def process_screen_request(self, conversation_history, request_type="analyze", original_text=""):
-        """Process screen capture with specific request type"""
-        captured_text = self.capture_screen()
+    def capture_lines(self, start_line, end_line):
+        """OCR only the requested editor lines plus a margin, returns (text, first, last) or None"""
+        try:
+            print(f"🎯 Locating lines {start_line}-{end_line} on screen...")
+            start_time = time.time()
+            with self.foreground():
+                screenshot = self.grab_screen()
+                located = self.line_locator.locate(screenshot, start_line, end_line)
+                if located is None:
+                    print("   Requested lines not found on screen, capturing the whole screen")
+                    return None
+                box, first, last = located
+                with tracer.span("ocr", kind="lines", lines=last - first + 1):
+                    text = self.ocr_engine.ocr_bands([screenshot.crop(box)])[0]
+            
+            if not text.strip():
+                return None
+            print(f"✅ Extracted lines {first}-{last}: {len(text)} characters from a "
+                  f"{box[2] - box[0]}x{box[3] - box[1]} region ({time.time() - start_time:.2f}s)")
+            return text, first, last
+            
+        except Exception as e:
+            print(f"❌ Line capture error: {e}")
+            return None
+    
+    def capture_in_context(self, capture, conversation_history):
+        """Whether the model still sees the full text of an earlier capture"""
+        index = capture["index"]
+        if index >= len(conversation_history) or conversation_history[index] is not capture["message"]:
+            return False
+        # Folded turns only survive as a one-line summary
+        return index >= utils.context_builder.folded_count(id(conversation_history))
+    
+    def capture_payload(self, kind, captured_text, conversation_history):
+        """Capture text to send, or a reference or diff against the last full capture. Returns (payload, mode)"""
+        previous = self.last_capture
+        if (not utils.SCREEN_DELTA_PROMPTS or previous is None or previous["kind"] != kind
+                or not self.capture_in_context(previous, conversation_history)):
+            return captured_text, "full"
+        
+        if captured_text == previous["text"]:
+            return "(The screen is unchanged since the capture I sent earlier in this conversation.)", "unchanged"
+        
+        old_lines = previous["text"].splitlines()
+        new_lines = captured_text.splitlines()
+        overlap = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False).ratio()
+        if overlap < utils.SCREEN_DELTA_THRESHOLD:
+            return captured_text, "full"
+        
+        diff = "\n".join(difflib.unified_diff(old_lines, new_lines, "previous capture", "current screen",
+                                              n=1, lineterm=""))
+        payload = ("(The screen changed since the capture I sent earlier in this conversation. "
+                   f"Line-level diff against that capture:)\n{diff}")
+        if len(payload) >= len(captured_text):
+            return captured_text, "full"
+        return payload, f"diff, {overlap:.0%} overlap"
+    
+    def remember_capture(self, kind, captured_text, prompt, conversation_history):
+        """Keep the capture that was just sent in full, with its history message"""
+        for index in range(len(conversation_history) - 1, -1, -1):
+            message = conversation_history[index]
+            if message["role"] == "user" and utils.message_text(message) == prompt:
+                self.last_capture = {"kind": kind, "text": captured_text, "message": message, "index": index}
+                return
+    
+    def prepare_screen_request(self, conversation_history, request_type="analyze", original_text=""):
+        """Capture the screen and build the prompt for a request, None if nothing could be read.
+
+        Returns a dict with the timestamped prompt and what finish_screen_request
+        needs once the answer is in the history.
+        """
+        # Check for line number specifications
+        start_line, end_line = self.extract_line_numbers(original_text)
+        
+        # A line range only needs that part of the screen read and sent
+        captured = self.capture_lines(start_line, end_line) if start_line and end_line else None
+        if captured:
+            captured_text, first, last = captured
+            kind = f"lines {first}-{last}"
+        else:
+            captured_text = self.capture_screen()
+            kind = "screen"
         
         if not captured_text:
-            response = "I couldn't capture any code from your screen, Sir."
+            response = self.NO_CAPTURE_RESPONSE
             print(f"Jarvis: {response}")
             utils.tts_caller(response)
-            return
-            
-        # Check for line number specifications
-        start_line, end_line = self.extract_line_numbers(original_text)
+            return None
         
         # Create context-aware prompt
         if start_line and end_line:
@@ -114,15 +237,20 @@ class ScreenMonitor:
                 line_context = f"focusing specifically on line {start_line}"
             else:
                 line_context = f"focusing specifically on lines {start_line} to {end_line}"
+            if captured:
+                line_context += f" (the excerpt shows lines {first} to {last} with their line numbers)"
         else:
             line_context = ""
+        
+        # Repeat captures of a mostly unchanged screen go out as a diff
+        payload, payload_mode = self.capture_payload(kind, captured_text, conversation_history)
             
         prompts = {
-            "analyze": f"Please analyze this code I'm looking at {line_context} and tell me if it makes sense or suggest improvements:\n\n{captured_text}",
-            "explain": f"Please explain what this code does {line_context}:\n\n{captured_text}",
-            "review": f"Please review this code {line_context} for potential bugs or issues:\n\n{captured_text}",
-            "suggest": f"Please suggest improvements for this code {line_context}:\n\n{captured_text}",
-            "debug": f"Help me debug this code {line_context} - what might be wrong:\n\n{captured_text}"
+            "analyze": f"Please analyze this code I'm looking at {line_context} and tell me if it makes sense or suggest improvements:\n\n{payload}",
+            "explain": f"Please explain what this code does {line_context}:\n\n{payload}",
+            "review": f"Please review this code {line_context} for potential bugs or issues:\n\n{payload}",
+            "suggest": f"Please suggest improvements for this code {line_context}:\n\n{payload}",
+            "debug": f"Help me debug this code {line_context} - what might be wrong:\n\n{payload}"
         }
         
         prompt = prompts.get(request_type, prompts["analyze"])
@@ -131,14 +259,29 @@ class ScreenMonitor:
         timestamped_prompt = prompt + " " + time.strftime("%Y-%m-%d %H-%M-%S")
         
         print(f"🤖 Processing screen capture with {request_type} request...")
-        response = utils.ask_question_memory(timestamped_prompt, conversation_history)
-        
-        # Split response and speech (keeping your existing format)
-        speech = response.split('#')[0]
-        print(f"Jarvis: {speech}")
+        print(f"📦 Screen prompt: {len(timestamped_prompt.encode('utf-8'))} bytes ({payload_mode}, "
+              f"capture is {len(captured_text.encode('utf-8'))} bytes)")
+        return {"prompt": timestamped_prompt, "kind": kind, "text": captured_text, "mode": payload_mode}
+    
+    def finish_screen_request(self, request, conversation_history):
+        """Remember a capture that was sent in full, once its prompt is in the history"""
+        if request["mode"] == "full":
+            self.remember_capture(request["kind"], request["text"], request["prompt"], conversation_history)
+    
+    def process_screen_request(self, conversation_history, request_type="analyze", original_text=""):
+        """Process screen capture with specific request type"""
+        request = self.prepare_screen_request(conversation_history, request_type, original_text)
+        if request is None:
+            return
         
-        # Play TTS
-        utils.tts_caller(speech)
+        # Stream the answer into TTS so speech starts after the first sentence;
+        # the pipeline stops speaking at the '#' marker (keeping your existing format).
+        # Delta prompts only make sense next to the capture they refer to, so they skip the response cache
+        utils.tts_stream_caller(
+            utils.ask_question_memory_stream(request["prompt"], conversation_history, cacheable=False),
+            echo_prefix="Jarvis: "
+        )
+        self.finish_screen_request(request, conversation_history)
     
     def start_monitoring(self):
         """Start the screen monitoring"""
@@ -146,6 +289,8 @@ class ScreenMonitor:
             return
             
         self.monitoring = True
+        # OCR workers start while the user reads the prompt, not on the first request
+        self.ocr_engine.start()
         print("🎯 Screen monitoring active - Natural commands available:")
         print("   'Can you analyze this code?'")
         print("   'Look at this code and explain it'") 
@@ -154,18 +299,38 @@ class ScreenMonitor:
         print("   'Debug this code'")
         print("   'Look at lines 50-75'")
         print("   'Check line 42'")
+        
+        # Keep OCR of the current screen ready so requests skip it
+        if utils.SCREEN_PREFETCH:
+            self.prefetcher = ScreenPrefetcher(
+                self.grab_screen, self.ocr_cache, self.prefetch_ocr, self.foreground_capture,
+                min_interval=utils.SCREEN_PREFETCH_MIN_INTERVAL,
+                max_interval=utils.SCREEN_PREFETCH_MAX_INTERVAL,
+                cpu_budget=utils.SCREEN_PREFETCH_CPU_BUDGET
+            )
+            self.prefetcher.start()
+            print("🔄 Background screen prefetch running")
 
-        jarvis_response = "Screen monitoring enabled, Sir. I can now analyze your code when you ask. You can ask me to analyze, explain, debug, or review any code on your screen. You can also specify line numbers if needed."
-        utils.tts_caller(jarvis_response)
+        utils.tts_caller(self.MONITORING_ENABLED_RESPONSE)
         
-    def stop_monitoring(self):
+    def stop_monitoring(self, announce=True):
         """Stop screen monitoring"""
         if not self.monitoring:
             return
             
         self.monitoring = False
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
+        self.ocr_cache.clear()
         print("✅ Screen monitor stopped")
         
-        response = "Screen monitoring disabled, Sir."
-        print(f"Jarvis: {response}")
-        utils.tts_caller(response)
\ No newline at end of file
+        if announce:
+            response = self.MONITORING_DISABLED_RESPONSE
+            print(f"Jarvis: {response}")
+            utils.tts_caller(response)
+    
+    def shutdown(self):
+        """Stop monitoring quietly and release the OCR worker processes"""
+        self.stop_monitoring(announce=False)
+        self.ocr_engine.shutdown()
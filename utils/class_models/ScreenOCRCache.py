@@ -0,0 +1,159 @@
+import hashlib
+import threading
+import time
+
+class ScreenOCRCache:
+    """OCR text of the last screenshot, kept per horizontal band.
+
+    Bands span the full width and are cut on the most uniform row near every
+    band_height pixels, which is normally the gap between two lines of text.
+    When no blank row is near, neighbouring bands overlap and the repeated
+    line is dropped when the text is stitched. Every band is hashed from a downsampled
+    grayscale copy of the frame. An identical frame returns the cached text
+    without any OCR, a changed frame re-OCRs only the bands whose hash changed.
+    """
+
+    def __init__(self, band_height=160, downsample=4, snap_ratio=0.25, blank_threshold=0.25, overlap=16):
+        self.band_height = band_height
+        self.downsample = downsample
+        self.snap_ratio = snap_ratio
+        # Pixels added on each side of a cut that runs through text
+        self.overlap = overlap
+        # Bands whose rows all vary less than this, in quantized gray levels, hold no text
+        self.blank_threshold = blank_threshold
+
+        self.lock = threading.Lock()
+        self.frame_digest = None
+        self.frame_text = None
+        self.bands = {}  # (top, bottom, digest) -> text, for the last frame only
+        self.published = {}  # bands read so far by a background pass that has not finished
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def fingerprint(self, image):
+        """Downsampled grayscale pixels and their digest, cheap next to OCR"""
+        import numpy as np
+        gray = np.asarray(image.convert("L").reduce(self.downsample), dtype=np.uint8)
+        # Dropping the low bits keeps anti-aliasing and compression noise from counting as change
+        quantized = gray >> 3
+        return quantized, self._digest(str(quantized.shape).encode() + quantized.tobytes())
+
+    def _cut_rows(self, quantized):
+        import numpy as np
+        height = quantized.shape[0]
+        step = max(1, self.band_height // self.downsample)
+        reach = max(1, int(step * self.snap_ratio))
+        row_spread = quantized.std(axis=1)
+
+        cuts = [0]
+        nominal = step
+        while nominal + reach < height:
+            low = max(cuts[-1] + 1, nominal - reach)
+            cut = low + int(np.argmin(row_spread[low:nominal + reach]))
+            cuts.append(cut)
+            nominal = cut + step
+        cuts.append(height)
+        return cuts, row_spread
+
+    def _crop_box(self, image, top, bottom, row_spread):
+        upper = top * self.downsample
+        lower = min(image.height, bottom * self.downsample)
+        if top > 0 and row_spread[top] >= self.blank_threshold:
+            upper = max(0, upper - self.overlap)
+        if bottom < len(row_spread) and row_spread[bottom] >= self.blank_threshold:
+            lower = min(image.height, lower + self.overlap)
+        return (0, upper, image.width, lower)
+
+    @staticmethod
+    def stitch(texts):
+        """Join band texts in order, dropping a line repeated across an overlapping seam"""
+        lines = []
+        for text in texts:
+            band_lines = text.splitlines()
+            if lines and band_lines and band_lines[0].strip() and band_lines[0].strip() == lines[-1].strip():
+                band_lines = band_lines[1:]
+            lines.extend(band_lines)
+        return "\n".join(lines)
+
+    def extract(self, image, ocr_bands, fingerprint=None, abort=None):
+        """OCR a PIL image through the cache, returns (text, stats).
+
+        ocr_bands is called with the list of band images that need OCR and
+        returns their texts in the same order, e.g. ScreenOCREngine.ocr_bands.
+        fingerprint may be passed in when the caller already computed it.
+
+        With an abort event the bands are OCR'd one at a time and published
+        as each is read, for background passes: once abort is set the pass
+        stops after the current band and returns None as the text, and the
+        next extract reuses what it already read.
+        """
+        start_time = time.time()
+        quantized, frame_digest = fingerprint or self.fingerprint(image)
+        with self.lock:
+            if frame_digest == self.frame_digest:
+                self.hits += 1
+                return self.frame_text, {"bands": len(self.bands), "ocr_bands": 0,
+                                         "unchanged": True, "seconds": time.time() - start_time}
+            previous = dict(self.published)
+            previous.update(self.bands)
+            if abort is not None:
+                # Only the latest background pass is worth resuming
+                self.published = {}
+
+        cuts, row_spread = self._cut_rows(quantized)
+        bands = {}
+        pending = []
+        for top, bottom in zip(cuts, cuts[1:]):
+            key = (top, bottom, self._digest(quantized[top:bottom].tobytes()))
+            if key in previous:
+                bands[key] = previous[key]
+            elif row_spread[top:bottom].max() < self.blank_threshold:
+                # Flat background, nothing to read
+                bands[key] = ""
+            else:
+                bands[key] = None
+                pending.append((key, image.crop(self._crop_box(image, top, bottom, row_spread))))
+
+        if abort is not None:
+            for key, band in pending:
+                if abort.is_set():
+                    return None, {"bands": len(bands), "ocr_bands": 0, "unchanged": False,
+                                  "aborted": True, "seconds": time.time() - start_time}
+                bands[key] = ocr_bands([band])[0].rstrip()
+                with self.lock:
+                    self.published[key] = bands[key]
+        elif pending:
+            # Changed bands go out in one batch so they can be OCR'd concurrently
+            texts = ocr_bands([band for _, band in pending])
+            for (key, _), text in zip(pending, texts):
+                bands[key] = text.rstrip()
+
+        frame_text = self.stitch(text for text in bands.values() if text.strip())
+        with self.lock:
+            self.frame_digest = frame_digest
+            self.frame_text = frame_text
+            self.bands = bands
+            self.published = {}
+            self.misses += 1
+        return frame_text, {"bands": len(bands), "ocr_bands": len(pending),
+                            "unchanged": False, "seconds": time.time() - start_time}
+
+    def clear(self):
+        with self.lock:
+            self.frame_digest = None
+            self.frame_text = None
+            self.bands = {}
+            self.published = {}
+
+    @staticmethod
+    def describe(stats):
+        """One-line summary for the capture output"""
+        if stats["unchanged"]:
+            return f"♻️ Screen unchanged, reused OCR text ({stats['seconds']:.2f}s)"
+        reused = stats["bands"] - stats["ocr_bands"]
+        return (f"🔍 OCR'd {stats['ocr_bands']} of {stats['bands']} bands, "
+                f"{reused} unchanged or blank ({stats['seconds']:.2f}s)")
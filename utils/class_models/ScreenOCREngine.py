@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+# Code fonts render around 12-14px on screen, tesseract reads best at about twice that
+DEFAULT_SCALE = 2.0
+
+def _init_worker():
+    # Bands already run one per process, tesseract threads on top would oversubscribe the cores
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def otsu_threshold(pixels):
+    """Gray level that best separates text from background in a uint8 array"""
+    import numpy as np
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_background = np.cumsum(histogram)
+    weight_foreground = pixels.size - weight_background
+    cumulative = np.cumsum(histogram * levels)
+    mean_background = cumulative / np.maximum(weight_background, 1)
+    mean_foreground = (cumulative[-1] - cumulative) / np.maximum(weight_foreground, 1)
+    between_variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+    return int(np.argmax(between_variance))
+
+def preprocess(image, scale=DEFAULT_SCALE, binarize=True):
+    """Grayscale with dark text on a light background, upscaled and optionally binarized"""
+    import numpy as np
+    from PIL import Image
+    gray = image.convert("L")
+    # Dark editor themes are inverted, tesseract expects dark text
+    if np.asarray(gray).mean() < 128:
+        gray = Image.eval(gray, lambda level: 255 - level)
+    if scale != 1:
+        gray = gray.resize((round(gray.width * scale), round(gray.height * scale)), Image.LANCZOS)
+    if not binarize:
+        return gray
+    pixels = np.asarray(gray)
+    return Image.fromarray(np.where(pixels > otsu_threshold(pixels), 255, 0).astype(np.uint8))
+
+def ocr_band(image, scale=DEFAULT_SCALE, binarize=True, config="", nice=0):
+    """Preprocess and OCR one band, runs inside a pool worker"""
+    import pytesseract
+    return pytesseract.image_to_string(preprocess(image, scale, binarize), config=config, nice=nice)
+
+class ScreenOCREngine:
+    """OCRs screenshot bands concurrently on a process pool.
+
+    Preprocessing runs in the workers too, so a 4K frame uses every core
+    instead of one. The pool is created on first use, or ahead of it by start().
+    Workers are spawned rather than forked, forking a process that runs the
+    TTS loop, health prober and executor threads can deadlock the children.
+    A spawned worker re-runs the main script's imports, which only define
+    configuration, utils.start_backends is left to the app and the server.
+    """
+
+    def __init__(self, workers=None, scale=DEFAULT_SCALE, binarize=True, config=""):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.scale = scale
+        self.binarize = binarize
+        self.config = config
+
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def _pool(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+            return self.executor
+
+    def start(self):
+        """Spawn the workers in the background, a spawned worker takes a moment to import"""
+        if self.workers > 1:
+            pool = self._pool()
+            for _ in range(self.workers):
+                pool.submit(os.getpid)
+
+    def ocr_bands(self, images, nice=0, parallel=True):
+        """OCR band images, texts come back in the same order"""
+        if not parallel or len(images) <= 1 or self.workers == 1:
+            # Not worth a round trip through the pool
+            return [ocr_band(image, self.scale, self.binarize, self.config, nice) for image in images]
+        return list(self._pool().map(ocr_band, images, repeat(self.scale), repeat(self.binarize),
+                                     repeat(self.config), repeat(nice)))
+
+    def read_words(self, image, config=""):
+        """Word boxes from image_to_data, in the coordinates of the original image"""
+        import pytesseract
+        data = pytesseract.image_to_data(preprocess(image, self.scale, self.binarize), config=config,
+                                         output_type=pytesseract.Output.DICT)
+        words = []
+        for index, text in enumerate(data["text"]):
+            text = text.strip()
+            if not text:
+                continue
+            left = data["left"][index] / self.scale
+            top = data["top"][index] / self.scale
+            words.append({
+                "text": text,
+                "left": left,
+                "top": top,
+                "right": left + data["width"][index] / self.scale,
+                "bottom": top + data["height"][index] / self.scale,
+                "conf": float(data["conf"][index])
+            })
+        return words
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
@@ -0,0 +1,74 @@
+import threading
+import time
+
+class ScreenPrefetcher:
+    """Keeps a ScreenOCRCache current in the background while screen monitoring is on.
+
+    The screen is fingerprinted every interval. A static screen doubles the
+    interval up to max_interval. A change runs OCR on the changed bands and
+    then waits long enough to keep OCR under cpu_budget of one core.
+
+    foreground is set while a user request captures the screen. A pass in
+    progress then stops after its current band, leaving the bands it read
+    for the request, and no new pass starts until the request is done.
+    """
+
+    def __init__(self, capture, ocr_cache, ocr_bands, foreground, min_interval=1.0, max_interval=10.0, cpu_budget=0.2):
+        self.capture = capture
+        self.ocr_cache = ocr_cache
+        self.ocr_bands = ocr_bands
+        self.foreground = foreground
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cpu_budget = cpu_budget
+
+        self.stop_event = threading.Event()
+        self.worker = None
+        self.passes = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        if self.worker and self.worker.is_alive():
+            return
+        self.stop_event.clear()
+        self.worker = threading.Thread(target=self._run, name="screen-prefetch", daemon=True)
+        self.worker.start()
+
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        if self.worker and self.worker is not threading.current_thread():
+            self.worker.join(timeout)
+
+    def next_interval(self, busy):
+        """Wait after an OCR pass that took busy seconds, sized to the CPU budget"""
+        return min(self.max_interval, max(self.min_interval, busy * (1 / self.cpu_budget - 1)))
+
+    def _run(self):
+        interval = self.min_interval
+        last_digest = None
+        while not self.stop_event.wait(interval):
+            if self.foreground.is_set():
+                # Try again soon after the request, its OCR may already cover the screen
+                interval = self.min_interval
+                continue
+            try:
+                image = self.capture()
+                fingerprint = self.ocr_cache.fingerprint(image)
+                if fingerprint[1] == last_digest:
+                    # Static screen, back off until something changes
+                    interval = min(self.max_interval, interval * 2)
+                    continue
+                last_digest = fingerprint[1]
+
+                busy_start = time.time()
+                text, _ = self.ocr_cache.extract(image, self.ocr_bands, fingerprint, abort=self.foreground)
+                busy = time.time() - busy_start
+                if text is None:
+                    # Stopped for a foreground request, look at the screen again afterwards
+                    last_digest = None
+                self.passes += 1
+                self.busy_seconds += busy
+                interval = self.next_interval(busy)
+            except Exception as e:
+                print(f"⚠️ Screen prefetch failed: {e}")
+                interval = self.max_interval
@@ -0,0 +1,50 @@
+import threading
+import time
+
+class ShutdownCoordinator:
+    """Stops components concurrently, each with its own deadline.
+
+    A component that misses its deadline is abandoned on its daemon thread so
+    one hung device cannot hold up the exit.
+    """
+
+    def __init__(self):
+        self.components = []
+
+    def add(self, name, stop, deadline=2.0):
+        self.components.append((name, stop, deadline))
+
+    @staticmethod
+    def _stop(stop, result):
+        start = time.perf_counter()
+        try:
+            stop()
+        except Exception as e:
+            result["error"] = e
+        result["duration"] = time.perf_counter() - start
+
+    def run(self):
+        """Stop every component, returns {name: (status, seconds)}"""
+        start = time.perf_counter()
+        running = []
+        for name, stop, deadline in self.components:
+            result = {}
+            thread = threading.Thread(target=self._stop, args=(stop, result), name=f"stop-{name}", daemon=True)
+            thread.start()
+            running.append((name, deadline, thread, result))
+
+        report = {}
+        for name, deadline, thread, result in running:
+            thread.join(max(0.0, start + deadline - time.perf_counter()))
+            if thread.is_alive():
+                print(f"⏰ {name} did not stop within {deadline:.1f}s, abandoning it")
+                report[name] = ("timeout", deadline)
+            elif "error" in result:
+                print(f"⚠️ {name} cleanup failed after {result['duration']:.2f}s: {result['error']}")
+                report[name] = ("error", result["duration"])
+            else:
+                print(f"✅ {name} stopped in {result['duration']:.2f}s")
+                report[name] = ("stopped", result["duration"])
+
+        print(f"🧹 Shutdown took {time.perf_counter() - start:.2f}s")
+        return report
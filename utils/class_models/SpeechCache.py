@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+class SpeechCache:
+    def __init__(self, cache_dir, max_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # key -> size in bytes, least recently used first
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from file modification times"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp3"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, name[:-4], stat.st_size))
+
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def make_key(text, voice, audio_format):
+        """Content address for a (cleaned text, voice, format) triple"""
+        raw = "\x00".join([text, voice, audio_format]).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def contains(self, text, voice, audio_format):
+        with self.lock:
+            return self.make_key(text, voice, audio_format) in self.entries
+
+    def get(self, text, voice, audio_format):
+        """Return cached mp3 bytes or None"""
+        key = self.make_key(text, voice, audio_format)
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    audio = f.read()
+                # Touch the file so the LRU order survives restarts
+                os.utime(self._path(key))
+            except OSError:
+                self.total_bytes -= self.entries.pop(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def put(self, text, voice, audio_format, audio):
+        """Store mp3 bytes and evict least recently used clips over the size cap"""
+        if not audio or len(audio) > self.max_bytes:
+            return
+        key = self.make_key(text, voice, audio_format)
+        path = self._path(key)
+        with self.lock:
+            try:
+                # Write then rename so a crash never leaves a truncated clip
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"⚠️ Speech cache write failed: {e}")
+                return
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)
+            self.entries[key] = len(audio)
+            self.total_bytes += len(audio)
+            self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
@@ -0,0 +1,59 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupProfiler:
+    """Records how long each import and initialization step takes.
+
+    Steps on background threads are recorded as well. Anything still running
+    when report() is called is listed as pending and printed once it finishes.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.steps = []
+        self.pending = {}
+        self.reported = False
+
+    @contextmanager
+    def step(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        thread = threading.current_thread().name
+        with self.lock:
+            self.pending[name] = start
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, thread)
+
+    def record(self, name, start, duration, thread):
+        with self.lock:
+            self.pending.pop(name, None)
+            self.steps.append((start - self.origin, duration, name, thread))
+            late = self.reported
+        if late:
+            print(f"⏱️ {name} finished in {duration:.3f}s on {thread} "
+                  f"({time.perf_counter() - self.origin:.3f}s after start)")
+
+    def report(self):
+        """Print every step so far, ordered by start time"""
+        if not self.enabled:
+            return
+        with self.lock:
+            steps = sorted(self.steps)
+            pending = sorted(self.pending.items(), key=lambda item: item[1])
+            self.reported = True
+        print(f"⏱️ Startup profile, ready after {time.perf_counter() - self.origin:.3f}s:")
+        for offset, duration, name, thread in steps:
+            where = "" if thread == "MainThread" else f" [{thread}]"
+            print(f"   {offset:7.3f}s +{duration:.3f}s  {name}{where}")
+        for name, start in pending:
+            print(f"   {start - self.origin:7.3f}s  {name} still loading in the background")
+
+# Shared by every module, Jarvis.py enables it for --startup-profile
+startup_profiler = StartupProfiler()
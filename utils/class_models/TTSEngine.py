@@ -0,0 +1,132 @@
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import Future
+import edge_tts
+from pygame import mixer
+from utils.class_models.Tracer import run_in_context, tracer
+
+# edge_tts always returns constant bitrate mp3 in this format, which lets us
+# work out clip duration from the byte count
+AUDIO_FORMAT = "audio-24khz-48kbitrate-mono-mp3"
+AUDIO_BITRATE = 48000
+
+class TTSEngine:
+    def __init__(self, voice="en-AU-WilliamNeural", cache=None):
+        self.voice = voice
+        self.audio_format = AUDIO_FORMAT
+        self.cache = cache
+
+        # One long-lived event loop for every edge_tts request
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, name="tts-loop", daemon=True)
+        self.loop_thread.start()
+
+        # Only one clip can own mixer.music at a time
+        self.playback_lock = threading.Lock()
+        self.stop_requested = threading.Event()
+
+    async def _synthesize(self, text):
+        """Collect edge_tts audio chunks into an in-memory buffer"""
+        buffer = io.BytesIO()
+        communicate = edge_tts.Communicate(text, self.voice)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                buffer.write(chunk["data"])
+        return buffer.getvalue()
+
+    def synthesize_async(self, text):
+        """Schedule synthesis on the engine loop, returns a concurrent Future of mp3 bytes"""
+        return asyncio.run_coroutine_threadsafe(self._synthesize(text), self.loop)
+
+    def synthesize(self, text):
+        """Synthesize text to mp3 bytes, returns None on failure"""
+        with tracer.span("tts_synth", chars=len(text)) as span:
+            if self.cache:
+                audio = self.cache.get(text, self.voice, self.audio_format)
+                span["cached"] = bool(audio)
+                if audio:
+                    return audio
+            try:
+                audio = self.synthesize_async(text).result()
+            except Exception as e:
+                print(f"TTS Error: {e}")
+                span["error"] = type(e).__name__
+                return None
+        if not audio:
+            return None
+        if self.cache:
+            self.cache.put(text, self.voice, self.audio_format, audio)
+        return audio
+
+    def warm_up(self, phrases):
+        """Pre-render phrases into the cache so their first use skips edge_tts"""
+        if not self.cache:
+            return 0
+        rendered = 0
+        for text in phrases:
+            if self.cache.contains(text, self.voice, self.audio_format):
+                continue
+            if self.synthesize(text):
+                rendered += 1
+        return rendered
+
+    def play(self, audio):
+        """Start playing mp3 bytes, returns a Future that resolves when playback ends"""
+        done = Future()
+        # Cleared here rather than in the playback thread, so a stop() that
+        # arrives before the clip starts still cancels it
+        self.stop_requested.clear()
+        threading.Thread(target=run_in_context(self._play, audio, done), name="tts-playback", daemon=True).start()
+        return done
+
+    def _play(self, audio, done):
+        with self.playback_lock:
+            # A barge-in may have cancelled the future while the clip waited for the lock
+            if not done.set_running_or_notify_cancel():
+                return
+            try:
+                if self.stop_requested.is_set():
+                    done.set_result(False)
+                    return
+                duration = len(audio) * 8 / AUDIO_BITRATE
+                with tracer.span("playback", clip=round(duration, 3)) as span:
+                    mixer.music.load(io.BytesIO(audio), "mp3")
+                    mixer.music.play()
+                    self._wait_for_end(duration)
+                    span["interrupted"] = self.stop_requested.is_set()
+                mixer.music.unload()
+                done.set_result(True)
+            except Exception as e:
+                print(f"Sound playback error: {e}")
+                done.set_exception(e)
+
+    def _wait_for_end(self, duration):
+        """Block until the current clip finishes or stop() is called"""
+        # Sleep through the known clip length in one wait, then only cover the
+        # few milliseconds of decoder lag instead of polling the whole clip
+        if self.stop_requested.wait(duration):
+            mixer.music.stop()
+            return
+        while mixer.music.get_busy() and not self.stop_requested.is_set():
+            time.sleep(0.02)
+        if self.stop_requested.is_set():
+            mixer.music.stop()
+
+    def stop(self):
+        """Interrupt the clip that is currently playing"""
+        self.stop_requested.set()
+
+    def speak(self, text):
+        """Synthesize and play text, blocking until playback completes"""
+        audio = self.synthesize(text)
+        if not audio:
+            return False
+        self.play(audio).result()
+        return True
+
+    def shutdown(self):
+        """Stop the engine event loop"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join(timeout=2)
@@ -0,0 +1,202 @@
+import argparse
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+DEFAULT_TRACE_PATH = "~/.cache/jarvis/traces.jsonl"
+PERCENTILES = (50, 95, 99)
+
+# Turn id of the code running now, follows asyncio tasks and threads started with copy_context()
+current_turn = contextvars.ContextVar("current_turn", default=None)
+
+def run_in_context(target, *args):
+    """Thread target that runs in a copy of the caller's context, so spans keep their turn"""
+    context = contextvars.copy_context()
+    return lambda: context.run(target, *args)
+
+class Tracer:
+    """Per-turn latency spans written to a rotating JSONL file.
+
+    A span records one stage (stt, routing, inference, tts_synth, ...) with
+    its duration, the turn it belongs to and metadata such as backend, model
+    and token counts. The file rolls over to path.1 .. path.N at max_bytes.
+    """
+
+    def __init__(self, path=DEFAULT_TRACE_PATH, max_bytes=5 * 1024 * 1024, backups=3, enabled=False):
+        self.configure(path, max_bytes, backups, enabled)
+        self.lock = threading.Lock()
+        self.file = None
+        self.size = 0
+        self.write_failed = False
+
+    def configure(self, path, max_bytes, backups, enabled):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.enabled = enabled
+
+    @contextmanager
+    def turn(self, **fields):
+        """Group every span recorded inside the block under a new turn id"""
+        token = current_turn.set(uuid.uuid4().hex[:12])
+        try:
+            with self.span("turn", **fields) as turn_fields:
+                yield turn_fields
+        finally:
+            current_turn.reset(token)
+
+    @contextmanager
+    def span(self, stage, **fields):
+        """Time the block as a stage, metadata can be added to the yielded dict"""
+        if not self.enabled:
+            yield fields
+            return
+        start = time.time()
+        perf_start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            # Closed generators and cancelled tasks were interrupted, not broken
+            if type(e).__name__ in ("GeneratorExit", "CancelledError"):
+                fields["cancelled"] = True
+            else:
+                fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - perf_start, start=start, **fields)
+
+    def record(self, stage, duration, start=None, **fields):
+        """Record a span that was timed elsewhere"""
+        if not self.enabled:
+            return
+        entry = {
+            "time": round(start if start is not None else time.time() - duration, 3),
+            "turn": current_turn.get(),
+            "stage": stage,
+            "duration": round(duration, 6)
+        }
+        entry.update((key, value) for key, value in fields.items() if value is not None)
+        self._write(json.dumps(entry, default=str) + "\n")
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.size = os.path.getsize(self.path)
+
+    def _rotate(self):
+        self.file.close()
+        self.file = None
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{index}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def _write(self, line):
+        data_size = len(line.encode("utf-8"))
+        with self.lock:
+            try:
+                if self.file is None:
+                    self._open()
+                if self.size and self.size + data_size > self.max_bytes:
+                    self._rotate()
+                self.file.write(line)
+                self.file.flush()
+                self.size += data_size
+            except OSError as e:
+                # Report once, tracing must never break a turn
+                if not self.write_failed:
+                    print(f"⚠️ Trace write failed: {e}")
+                    self.write_failed = True
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+def load_spans(path, backups=3):
+    """Spans from the trace file and its rotated backups, oldest first"""
+    paths = [f"{path}.{index}" for index in range(backups, 0, -1)] + [path]
+    spans = []
+    for trace_path in paths:
+        if not os.path.exists(trace_path):
+            continue
+        with open(trace_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A line cut short by a crash
+                    continue
+    return spans
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted values"""
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+def print_table(title, groups, turns):
+    print(title)
+    print(f"   {'':<28} {'count':>6} " + " ".join(f"{f'p{p}':>8}" for p in PERCENTILES) + f" {'per turn':>9}")
+    for name in sorted(groups, key=lambda name: -sum(groups[name])):
+        durations = sorted(groups[name])
+        stats = " ".join(f"{percentile(durations, p):>7.3f}s" for p in PERCENTILES)
+        print(f"   {name[:28]:<28} {len(durations):>6} {stats} {sum(durations) / max(1, turns):>8.3f}s")
+
+def report(spans):
+    """Print p50/p95/p99 per stage and per stage and backend"""
+    if not spans:
+        print("❌ No spans recorded yet")
+        return
+    by_stage = defaultdict(list)
+    by_backend = defaultdict(list)
+    for span in spans:
+        by_stage[span["stage"]].append(span["duration"])
+        if span.get("backend"):
+            by_backend[f"{span['stage']} / {span['backend']}"].append(span["duration"])
+    turns = len(by_stage.get("turn", []))
+
+    first = min(span["time"] for span in spans)
+    last = max(span["time"] for span in spans)
+    print(f"📊 {len(spans)} spans over {turns} turns, "
+          f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(first))} to {time.strftime('%Y-%m-%d %H:%M', time.localtime(last))}")
+    # Stages overlap (synthesis runs while the model streams), so per-turn times do not add up to the turn
+    print_table("Per stage:", by_stage, turns)
+    if by_backend:
+        print_table("Per backend:", by_backend, turns)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize per-stage latency traces")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("--trace", default=os.environ.get("TRACE_PATH", DEFAULT_TRACE_PATH), help="trace file to read")
+    parser.add_argument("--backups", type=int, default=int(os.environ.get("TRACE_BACKUPS", "3")), help="rotated files to include")
+    parser.add_argument("--since", type=float, default=None, help="only spans from the last N hours")
+    parser.add_argument("--stage", action="append", help="only these stages, repeatable")
+    args = parser.parse_args()
+
+    spans = load_spans(os.path.expanduser(args.trace), args.backups)
+    if args.since is not None:
+        cutoff = time.time() - args.since * 3600
+        spans = [span for span in spans if span["time"] >= cutoff]
+    if args.stage:
+        spans = [span for span in spans if span["stage"] in args.stage]
+    report(spans)
+
+# Shared by every module, utils.py configures it from the environment
+tracer = Tracer()
+
+if __name__ == "__main__":
+    main()
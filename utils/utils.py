@@ -1,19 +1,33 @@
-from anthropic import Anthropic
-from openai import OpenAI
 from dotenv import load_dotenv
-import time
-from pygame import mixer
-import edge_tts
 import asyncio
+import time
+import importlib.util
 import os
 import requests
 import json
+import queue
+import re
+import threading
+from utils.class_models.BlobStore import BlobStore
+from utils.class_models.CircuitBreaker import CircuitBreaker
+from utils.class_models.ContextBuilder import ContextBuilder
+from utils.class_models.EscalationRouter import DEFAULT_LOG_PATH, DEFAULT_MODEL_PATH, EscalationRouter, RoutingLog, hashed_features, strip_timestamp
+from utils.class_models.IntentMatcher import IntentMatcher
+from utils.class_models.LazyResource import LazyResource
+from utils.class_models.OllamaClient import OllamaClient
+from utils.class_models.ResponseCache import ResponseCache
+from utils.class_models.SpeechCache import SpeechCache
+from utils.class_models.StartupProfiler import startup_profiler
+from utils.class_models.Tracer import DEFAULT_TRACE_PATH, run_in_context, tracer
 
 load_dotenv()
 
+# Resolved next to this file so Jarvis can be started from any directory
+ESCALATION_KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "escalation_keywords.json")
+
 def load_escalation_keywords():
     try:
-        with open('utils/escalation_keywords.json', 'r') as f:
+        with open(ESCALATION_KEYWORDS_PATH, 'r') as f:
             keywords_dict = json.load(f)
             
             # Flatten all categories into one list at load time
@@ -33,12 +47,155 @@ def load_escalation_keywords():
         return fallback, all_keywords
 
 # Load once at startup
-ESCALATION_KEYWORDS, ALL_ESCALATION_KEYWORDS = load_escalation_keywords()
+with startup_profiler.step("escalation keywords"):
+    ESCALATION_KEYWORDS, ALL_ESCALATION_KEYWORDS = load_escalation_keywords()
+
+SHUTDOWN_PHRASES = ["shutdown", "shut down"]
+
+START_MONITORING_PHRASES = [
+    # Direct commands
+    "start monitoring",
+    "start watching",
+    "start screen monitor",
+    "turn on monitoring",
+    "turn on screen monitor",
+    "screen monitor on",
+    "enable monitoring",
+    "enable screen monitor",
+    "activate monitoring",
+    "activate screen monitor",
+    
+    # More casual phrases
+    "watch the screen",
+    "monitor the screen",
+    "keep an eye on the screen",
+    "start screen recording",
+    "begin monitoring",
+    "begin watching",
+    "start tracking",
+    "track the screen",
+    "observe the screen",
+    "surveillance on",
+    
+    # Natural speech patterns
+    "can you monitor",
+    "please monitor",
+    "start to monitor",
+    "begin to watch",
+    "keep watch",
+    "watch my screen",
+    "monitor my screen",
+    "track my screen",
+    "record my screen",
+    "capture my screen",
+    
+    # Jarvis-style commands
+    "jarvis monitor",
+    "jarvis watch",
+    "jarvis start monitoring",
+    "jarvis screen on",
+    "monitor mode on",
+    "watching mode",
+    "surveillance mode",
+    
+    # Alternative phrasings
+    "switch on monitoring",
+    "fire up monitoring",
+    "boot up screen monitor",
+    "initialize monitoring",
+    "commence monitoring",
+    "engage monitoring"
+]
+
+STOP_MONITORING_PHRASES = [
+    # Direct commands
+    "stop monitoring",
+    "stop watching",
+    "stop screen monitor",
+    "turn off monitoring",
+    "turn off screen monitor",
+    "screen monitor off",
+    "disable monitoring",
+    "disable screen monitor",
+    "deactivate monitoring",
+    "deactivate screen monitor",
+    
+    # More casual phrases
+    "stop watching the screen",
+    "stop monitoring the screen",
+    "end monitoring",
+    "end watching",
+    "stop screen recording",
+    "stop tracking",
+    "stop tracking the screen",
+    "stop observing",
+    "surveillance off",
+    "quit monitoring",
+    
+    # Natural speech patterns
+    "stop monitoring please",
+    "please stop monitoring",
+    "can you stop monitoring",
+    "stop watching my screen",
+    "stop monitoring my screen",
+    "stop tracking my screen",
+    "stop recording my screen",
+    "stop capturing my screen",
+    
+    # Jarvis-style commands
+    "jarvis stop monitoring",
+    "jarvis stop watching",
+    "jarvis screen off",
+    "monitor mode off",
+    "watching mode off",
+    "surveillance mode off",
+    "jarvis disable monitoring",
+    
+    # Alternative phrasings
+    "switch off monitoring",
+    "shut down monitoring",
+    "shut off screen monitor",
+    "terminate monitoring",
+    "cease monitoring",
+    "halt monitoring",
+    "kill monitoring",
+    "cancel monitoring",
+    "exit monitoring",
+    "close monitoring"
+]
 
-def should_escalate_immediately(question):
-    """Fast keyword check using pre-built list"""
-    question_lower = question.lower()
-    return any(keyword in question_lower for keyword in ALL_ESCALATION_KEYWORDS)
+# Answers to these change with the clock or the world, they are never served from the response cache
+TIME_SENSITIVE_PHRASES = [
+    "what time", "the time", "time is it", "date", "today", "tonight", "tomorrow", "yesterday",
+    "now", "currently", "latest", "recent", "news", "weather", "forecast", "this week",
+    "this morning", "this evening", "good morning", "good afternoon", "good evening", "good night"
+]
+
+# Follow-ups that refer back to the conversation, or to what the user told it, are keyed on the last exchange too
+CONTEXT_DEPENDENT_PHRASES = [
+    "it", "its", "that", "this", "these", "those", "they", "them", "he", "she", "him", "her",
+    "again", "more", "else", "above", "previous", "last one", "why", "my", "me", "mine"
+]
+
+# One automaton for every vocabulary, JarvisApp and ScreenMonitor register theirs too
+intent_matcher = IntentMatcher()
+intent_matcher.add_phrases("escalation", ALL_ESCALATION_KEYWORDS)
+intent_matcher.add_phrases("explicit_cloud", ESCALATION_KEYWORDS.get("immediate_escalation", []))
+intent_matcher.add_phrases("shutdown", SHUTDOWN_PHRASES)
+intent_matcher.add_phrases("start_monitoring", START_MONITORING_PHRASES)
+intent_matcher.add_phrases("stop_monitoring", STOP_MONITORING_PHRASES)
+intent_matcher.add_phrases("time_sensitive", TIME_SENSITIVE_PHRASES, whole_word=True)
+intent_matcher.add_phrases("context_dependent", CONTEXT_DEPENDENT_PHRASES, whole_word=True)
+
+def classify_intents(text):
+    """Single pass over text returning {intent: [matched phrases]}"""
+    return intent_matcher.classify(text)
+
+def should_escalate_immediately(question, intents=None):
+    """Fast keyword check using the compiled intent matcher"""
+    if intents is None:
+        intents = classify_intents(question)
+    return "escalation" in intents
 
 # Environment variable configuration
 USE_OPENAI_ENV = os.environ.get("USE_OPENAI", "true").lower()
@@ -48,22 +205,18 @@ USE_OPENAI = USE_OPENAI_ENV in ["true", "1", "yes", "on"]
 ENABLE_AUDIO = os.environ.get("ENABLE_AUDIO", "auto").lower()
 AUDIO_AVAILABLE = False
 
-# Try to import RealtimeSTT only if audio is enabled and available
+# Only check that RealtimeSTT is installed, importing it pulls in torch and
+# whisper, which is left to the recorder when speech input is actually used
 if ENABLE_AUDIO in ["true", "auto"]:
-    try:
-        from RealtimeSTT import AudioToTextRecorder
-        AUDIO_AVAILABLE = True
+    AUDIO_AVAILABLE = importlib.util.find_spec("RealtimeSTT") is not None
+
+def describe_audio_input():
+    if AUDIO_AVAILABLE:
         print("🎤 Audio input available")
-    except ImportError:
-        AUDIO_AVAILABLE = False
-        if ENABLE_AUDIO == "true":
-            print("⚠️ Audio input not available (RealtimeSTT not installed)")
-        else:
-            print("📝 Text-only mode (audio dependencies not found)")
-    except Exception as e:
-        AUDIO_AVAILABLE = False
-        if ENABLE_AUDIO == "true":
-            print(f"⚠️ Audio input failed to initialize: {e}")
+    elif ENABLE_AUDIO == "true":
+        print("⚠️ Audio input not available (RealtimeSTT not installed)")
+    elif ENABLE_AUDIO == "auto":
+        print("📝 Text-only mode (audio dependencies not found)")
 
 SYSTEM_PROMPT = """You are Jarvis, you are similar to the AI assistant from Iron Man. Remember, I am not Tony Stark, just your creator. 
 You are formal and helpful, and you don't make up facts, you only comply to the user requests. 
@@ -81,131 +234,465 @@ CLAUDE_SECRET = os.environ.get("CLAUDE_API_KEY")
 OPENAI_SECRET = os.environ.get("OPENAI_API_KEY")
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "qwen2.5:7b")
 OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_HEALTH_INTERVAL = float(os.environ.get("OLLAMA_HEALTH_INTERVAL", "15"))
+
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "2"))
+OLLAMA_TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT", "30"))
+OLLAMA_MIN_TIMEOUT = float(os.environ.get("OLLAMA_MIN_TIMEOUT", "8"))
+OLLAMA_BREAKER_FAILURES = int(os.environ.get("OLLAMA_BREAKER_FAILURES", "3"))
+OLLAMA_BREAKER_COOLDOWN = float(os.environ.get("OLLAMA_BREAKER_COOLDOWN", "30"))
+# Calls whose first token takes longer than this, model load aside, count as failures
+OLLAMA_SLOW_CALL = float(os.environ.get("OLLAMA_SLOW_CALL", "5"))
+# Pooled keep-alive connections to Ollama, raise it for server mode so concurrent turns do not queue
+OLLAMA_POOL_SIZE = int(os.environ.get("OLLAMA_POOL_SIZE", "4"))
+
+# Keep the local model loaded between turns, a cold load costs seconds
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_WARMUP = os.environ.get("OLLAMA_WARMUP", "true").lower() in ["true", "1", "yes", "on"]
+OLLAMA_WARMUP_TIMEOUT = float(os.environ.get("OLLAMA_WARMUP_TIMEOUT", "120"))
+OLLAMA_COLD_LOAD = 0.5  # load_duration in seconds above which a turn counts as a cold start
+# Characters of a local answer checked for an escalation phrase before it starts streaming
+LOCAL_ESCALATION_WINDOW = int(os.environ.get("LOCAL_ESCALATION_WINDOW", "60"))
+
+# Opt-in hedged routing: race the cloud against a slow local answer
+HEDGED_ROUTING = os.environ.get("HEDGED_ROUTING", "false").lower() in ["true", "1", "yes", "on"]
+HEDGE_DELAY = float(os.environ.get("HEDGE_DELAY", "1.5"))
+HEDGE_BORDERLINE_WORDS = int(os.environ.get("HEDGE_BORDERLINE_WORDS", "25"))
+HEDGE_CANCEL_POLL = 0.1  # seconds between checks for an interrupted turn while waiting on the race
+
+# Per-backend prompt budgets in tokens, older turns get folded into a summary
+CONTEXT_BUDGETS = {
+    "ollama": int(os.environ.get("CONTEXT_BUDGET_OLLAMA", "1500")),
+    "openai": int(os.environ.get("CONTEXT_BUDGET_OPENAI", "6000")),
+    "claude": int(os.environ.get("CONTEXT_BUDGET_CLAUDE", "6000"))
+}
+
+# Large message bodies live in a content-addressed store, history keeps references
+HISTORY_BLOB_MIN_CHARS = int(os.environ.get("HISTORY_BLOB_MIN_CHARS", "2048"))
+HISTORY_BLOB_MEMORY_MB = float(os.environ.get("HISTORY_BLOB_MEMORY_MB", "8"))
+HISTORY_BLOB_DIR = os.environ.get("HISTORY_BLOB_DIR")
+blob_store = BlobStore(
+    max_memory=int(HISTORY_BLOB_MEMORY_MB * 1024 * 1024),
+    spill_dir=os.path.expanduser(HISTORY_BLOB_DIR) if HISTORY_BLOB_DIR else None
+)
+context_builder = ContextBuilder(CONTEXT_BUDGETS, blob_store=blob_store)
+
+# Per-stage latency spans, summarized by python -m utils.class_models.Tracer report
+TRACING = os.environ.get("TRACING", "true").lower() in ["true", "1", "yes", "on"]
+TRACE_PATH = os.path.expanduser(os.environ.get("TRACE_PATH", DEFAULT_TRACE_PATH))
+TRACE_MAX_MB = float(os.environ.get("TRACE_MAX_MB", "5"))
+TRACE_BACKUPS = int(os.environ.get("TRACE_BACKUPS", "3"))
+tracer.configure(TRACE_PATH, int(TRACE_MAX_MB * 1024 * 1024), TRACE_BACKUPS, TRACING)
+
+# Server mode (python Jarvis.py --server): many HTTP/WebSocket sessions in one process
+SERVER_HOST = os.environ.get("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", "8765"))
+SERVER_TOKEN = os.environ.get("SERVER_TOKEN")
+SERVER_MAX_SESSIONS = int(os.environ.get("SERVER_MAX_SESSIONS", "100"))
+SERVER_SESSION_TTL = float(os.environ.get("SERVER_SESSION_TTL", "1800"))
+# Questions a session may have in flight, they are still answered one at a time
+SERVER_SESSION_CONCURRENCY = int(os.environ.get("SERVER_SESSION_CONCURRENCY", "1"))
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", "16"))
+
+# Answers to repeated questions, keyed on the normalized question
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "true").lower() in ["true", "1", "yes", "on"]
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "600"))
+RESPONSE_CACHE_TTL_TECHNICAL = float(os.environ.get("RESPONSE_CACHE_TTL_TECHNICAL", "86400"))
+RESPONSE_CACHE_TTL_FOLLOWUP = float(os.environ.get("RESPONSE_CACHE_TTL_FOLLOWUP", "120"))
+# Per-intent TTLs in seconds, the shortest matching one wins
+RESPONSE_CACHE_TTLS = {
+    "escalation": RESPONSE_CACHE_TTL_TECHNICAL,
+    "explicit_cloud": RESPONSE_CACHE_TTL_TECHNICAL,
+    "context_dependent": RESPONSE_CACHE_TTL_FOLLOWUP
+}
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+
+# Anthropic prompt caching breakpoints on the system prompt and stable history
+PROMPT_CACHING = os.environ.get("PROMPT_CACHING", "true").lower() in ["true", "1", "yes", "on"]
+
+# Learned router: optionally log routing outcomes, consult a trained model when present
+ROUTER_LOGGING = os.environ.get("ROUTER_LOGGING", "false").lower() in ["true", "1", "yes", "on"]
+ROUTER_THRESHOLD = float(os.environ.get("ROUTER_THRESHOLD", "0.8"))
+ROUTER_LOG_PATH = os.path.expanduser(os.environ.get("ROUTER_LOG", DEFAULT_LOG_PATH))
+ROUTER_LOG_MAX_MB = float(os.environ.get("ROUTER_LOG_MAX_MB", "5"))
+ROUTER_LOG_BACKUPS = int(os.environ.get("ROUTER_LOG_BACKUPS", "3"))
+ROUTER_MODEL_PATH = os.path.expanduser(os.environ.get("ROUTER_MODEL", DEFAULT_MODEL_PATH))
+routing_log = RoutingLog(ROUTER_LOG_PATH, int(ROUTER_LOG_MAX_MB * 1024 * 1024), ROUTER_LOG_BACKUPS) if ROUTER_LOGGING else None
+
+def load_escalation_router():
+    router = EscalationRouter.load(ROUTER_MODEL_PATH)
+    if router:
+        print(f"🧭 Learned router loaded from {ROUTER_MODEL_PATH}")
+    return router
+
+# Loading the model imports NumPy, so it happens in the background
+escalation_router = LazyResource("router model", load_escalation_router)
+
+# Shared keep-alive client, health is probed in the background once start_backends runs
+ollama_client = OllamaClient(OLLAMA_BASE_URL, health_interval=OLLAMA_HEALTH_INTERVAL, pool_size=OLLAMA_POOL_SIZE)
+
+# Tracks Ollama latency and stops sending traffic to it after repeated failures or slow calls
+ollama_breaker = CircuitBreaker(
+    "Ollama",
+    failure_threshold=OLLAMA_BREAKER_FAILURES,
+    cooldown=OLLAMA_BREAKER_COOLDOWN,
+    slow_call_threshold=OLLAMA_SLOW_CALL,
+    default_timeout=OLLAMA_TIMEOUT,
+    min_timeout=OLLAMA_MIN_TIMEOUT,
+    max_timeout=OLLAMA_TIMEOUT
+)
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 
 # Initialize the appropriate client
-if USE_OPENAI:
-    client = OpenAI(api_key=OPENAI_SECRET)
-    MODEL_NAME = "gpt-4o"
-    print(f"Using OpenAI with model: {MODEL_NAME}")
-else:
-    client = Anthropic(api_key=CLAUDE_SECRET)
-    MODEL_NAME = "claude-sonnet-4-20250514"
-    print(f"Using Anthropic with model: {MODEL_NAME}")
-
-# Safe mixer initialization
-try:
-    mixer.init()
-    AUDIO_OUTPUT_AVAILABLE = True
-    print("🔊 Audio output initialized")
-except Exception as e:
-    AUDIO_OUTPUT_AVAILABLE = False
-    print(f"🔇 Audio output not available: {e}")
-    print("📝 TTS will be disabled - text responses only")
-
-def get_input_mode():
-    """Determine if we should use audio or text input"""
-    if not AUDIO_AVAILABLE:
-        return "text"
-    
-    if ENABLE_AUDIO == "false":
-        return "text"
-    
-    if ENABLE_AUDIO in ["true", "auto"]:
-        # Check if we're actually in an environment that supports audio
-        try:
-            # Simple test - try to initialize audio recorder
-            recorder = AudioToTextRecorder(spinner=False, model="tiny.en", language="en")
-            recorder.stop()  # Clean up immediately
-            print("🎤 Audio hardware detected - voice input available")
-            return "audio"
-        except Exception as e:
-            print(f"🔇 Audio hardware not available: {e}")
-            print("📝 Falling back to text input mode")
-            return "text"
-    
-    return "text"
-
-def query_ollama(question, conversation_history, model=None):
-    """Query Ollama local model with proper Jarvis system prompt"""
+MODEL_NAME = "gpt-4o" if USE_OPENAI else "claude-sonnet-4-20250514"
+
+def create_cloud_client():
+    # The SDK imports take a noticeable part of startup, so they happen here
+    if USE_OPENAI:
+        from openai import OpenAI
+        return OpenAI(api_key=OPENAI_SECRET)
+    from anthropic import Anthropic
+    return Anthropic(api_key=CLAUDE_SECRET)
+
+cloud_client = LazyResource("cloud client", create_cloud_client)
+
+# Speech cache configuration, repeated phrases skip the edge_tts round trip
+TTS_CACHE_ENABLED = os.environ.get("TTS_CACHE", "true").lower() in ["true", "1", "yes", "on"]
+TTS_CACHE_WARMUP = os.environ.get("TTS_CACHE_WARMUP", "true").lower() in ["true", "1", "yes", "on"]
+TTS_CACHE_DIR = os.path.expanduser(os.environ.get("TTS_CACHE_DIR", "~/.cache/jarvis/tts"))
+TTS_CACHE_MAX_MB = float(os.environ.get("TTS_CACHE_MAX_MB", "50"))
+
+def create_speech_cache():
+    if not TTS_CACHE_ENABLED:
+        return None
+    try:
+        return SpeechCache(TTS_CACHE_DIR, max_bytes=int(TTS_CACHE_MAX_MB * 1024 * 1024))
+    except OSError as e:
+        print(f"⚠️ Speech cache unavailable: {e}")
+        return None
+
+# Screen OCR: bands are preprocessed and OCR'd on a process pool
+SCREEN_OCR_WORKERS = int(os.environ.get("SCREEN_OCR_WORKERS", "0")) or None  # 0 = one per core, minus one
+SCREEN_OCR_SCALE = float(os.environ.get("SCREEN_OCR_SCALE", "2"))
+SCREEN_OCR_BINARIZE = os.environ.get("SCREEN_OCR_BINARIZE", "true").lower() in ["true", "1", "yes", "on"]
+# Extra lines OCR'd around a requested line range
+SCREEN_LINE_MARGIN = int(os.environ.get("SCREEN_LINE_MARGIN", "3"))
+
+# Repeat screen captures are sent as a diff while they overlap the last full one enough
+SCREEN_DELTA_PROMPTS = os.environ.get("SCREEN_DELTA_PROMPTS", "true").lower() in ["true", "1", "yes", "on"]
+SCREEN_DELTA_THRESHOLD = float(os.environ.get("SCREEN_DELTA_THRESHOLD", "0.6"))
+
+# Optional background OCR while screen monitoring is on
+SCREEN_PREFETCH = os.environ.get("SCREEN_PREFETCH", "false").lower() in ["true", "1", "yes", "on"]
+SCREEN_PREFETCH_MIN_INTERVAL = float(os.environ.get("SCREEN_PREFETCH_MIN_INTERVAL", "1"))
+SCREEN_PREFETCH_MAX_INTERVAL = float(os.environ.get("SCREEN_PREFETCH_MAX_INTERVAL", "10"))
+SCREEN_PREFETCH_CPU_BUDGET = float(os.environ.get("SCREEN_PREFETCH_CPU_BUDGET", "0.2"))
+SCREEN_PREFETCH_NICE = int(os.environ.get("SCREEN_PREFETCH_NICE", "10"))
+
+# Long-lived TTS engine: one event loop, in-memory audio, no speech.mp3 on disk
+TTS_VOICE = os.environ.get("TTS_VOICE", "en-AU-WilliamNeural")
+
+def create_tts_engine():
+    """Initialize the mixer and the TTS engine, None when there is no audio output"""
+    # Safe mixer initialization
+    try:
+        from pygame import mixer
+        mixer.init()
+        print("🔊 Audio output initialized")
+    except Exception as e:
+        print(f"🔇 Audio output not available: {e}")
+        print("📝 TTS will be disabled - text responses only")
+        return None
+    
+    from utils.class_models.TTSEngine import TTSEngine
+    return TTSEngine(voice=TTS_VOICE, cache=create_speech_cache())
+
+audio_output = LazyResource("audio output", create_tts_engine)
+
+def get_tts_engine():
+    """The TTS engine or None, waits if audio output is still initializing"""
+    return audio_output.get()
+
+def stop_audio_output():
+    """Shut the TTS engine and mixer down if audio output was ever initialized"""
+    tts_engine = audio_output.peek()
+    if tts_engine is not None:
+        tts_engine.shutdown()
+        from pygame import mixer
+        mixer.quit()
+
+def start_backends():
+    """Start the Ollama health prober and load the cloud client and router model in the background.
+
+    Importing this module starts nothing, OCR worker processes import it too.
+    """
+    print(f"Using {'OpenAI' if USE_OPENAI else 'Anthropic'} with model: {MODEL_NAME}")
+    ollama_client.start()
+    for resource in (cloud_client, escalation_router):
+        resource.start()
+
+def start_background_init():
+    """Build the heavy components on background threads so the prompt appears immediately"""
+    describe_audio_input()
+    start_backends()
+    audio_output.start()
+
+OLLAMA_CONTEXT = """If you don't know something or if the question is complex, just say "I should escalate this to my advanced systems, Sir." You are allowed to mention which model is being ran in ollama. For example, qwen2.5:7b or llama3.2 but only when asked."""
+OLLAMA_SYSTEM_PROMPT = SYSTEM_PROMPT + OLLAMA_CONTEXT
+
+def history_message(role, content):
+    """History entry for a message, large bodies are stored once in the blob store"""
+    if len(content) >= HISTORY_BLOB_MIN_CHARS:
+        content = blob_store.put(content)
+    return {'role': role, 'content': content}
+
+def message_text(message):
+    """Full text of a history entry"""
+    return context_builder.materialize(message['content'])
+
+def build_context(question, conversation_history, backend, system_prompt, record=True):
+    """Add the question to the history and fit it into the backend's token budget.
+    
+    Returns (system_parts, messages, stats), with message bodies loaded from the
+    blob store. With record=False the real history is left untouched, for
+    requests whose answer may never be used.
+    """
+    if record:
+        conversation_history.append(history_message('user', question))
+        turn_history = conversation_history
+    else:
+        turn_history = conversation_history + [{'role': 'user', 'content': question}]
+    return context_builder.build(turn_history, backend, system_prompt, key=id(conversation_history))
+
+def build_ollama_messages(question, conversation_history):
+    """Build the chat messages sent to Ollama's chat endpoint, returns (messages, stats)"""
+    # Use the same system prompt as Claude for consistency
+    system_parts, window, stats = build_context(question, conversation_history, "ollama",
+                                                OLLAMA_SYSTEM_PROMPT, record=False)
+    
+    # The system prompt leads unchanged every turn so Ollama can reuse the
+    # evaluated prefix from its KV cache instead of re-reading it
+    messages = [{"role": "system", "content": part} for part in system_parts]
+    messages.extend(window)
+    return messages, stats
+
+def describe_ollama_load(chunk):
+    """Cold or warm model load and prompt evaluation from the final chat chunk"""
+    load_seconds = chunk.get("load_duration", 0) / 1e9
+    state = "cold" if load_seconds >= OLLAMA_COLD_LOAD else "warm"
+    prompt_seconds = chunk.get("prompt_eval_duration", 0) / 1e9
+    return (f"{state} (load {load_seconds:.2f}s, prompt eval {chunk.get('prompt_eval_count', 0)} "
+            f"tokens in {prompt_seconds:.2f}s)")
+
+def warm_up_ollama(model=None):
+    """Load the local model and evaluate the system prompt on a background thread"""
+    if not OLLAMA_WARMUP:
+        return None
     if model is None:
         model = OLLAMA_MODEL
-        
+    
+    def warm_up():
+        # Same leading message as real turns, so the first question reuses its KV cache
+        messages = [{"role": "system", "content": OLLAMA_SYSTEM_PROMPT}]
+        load_seconds = ollama_client.warm_up(model, messages, OLLAMA_KEEP_ALIVE, timeout=OLLAMA_WARMUP_TIMEOUT)
+        if load_seconds is not None:
+            print(f"🔥 Ollama model {model} warm (load {load_seconds:.2f}s, keep alive {OLLAMA_KEEP_ALIVE})")
+    
+    thread = threading.Thread(target=warm_up, name="ollama-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def stream_local_answer(question, conversation_history, model=None, cancel_event=None, outcome=None, window=None):
+    """Stream the local model's answer once it is past the escalation window.
+    
+    Output is held back until it holds a complete sentence of at least window
+    characters, so an escalation phrase at the start aborts the local model before
+    anything reaches the caller; speech waits for a full sentence anyway. Without
+    a window nothing is yielded. outcome gets the full "response" (None if empty)
+    and whether any of it was "committed" to the caller.
+    """
+    if outcome is None:
+        outcome = {}
     start_time = time.time()
+    stream = stream_ollama(question, conversation_history, model, cancel_event)
+    response = ""
+    committed = False
     
     try:
-        # Check if Ollama is accessible first
-        health_url = f"{OLLAMA_BASE_URL}/api/tags"
-        health_check = requests.get(health_url, timeout=5)
-        if health_check.status_code != 200:
-            elapsed = time.time() - start_time
-            provider = "OpenAI" if USE_OPENAI else "Claude"
-            print(f"❌ Ollama not responding after {elapsed:.2f}s, escalating to {provider}...")
-            return None
-        
-        # Use the same system prompt as Claude for consistency
-        ollama_context = """If you don't know something or if the question is complex, just say "I should escalate this to my advanced systems, Sir." You are allowed to mention which model is being ran in ollama. For example, qwen2.5:7b or llama3.2 but only when asked."""
-        # Build conversation context
-        context = SYSTEM_PROMPT + ollama_context + "\n\n"
-        
-        # Add recent conversation history (last 4 messages to keep it manageable)
-        recent_history = conversation_history[-4:] if len(conversation_history) > 4 else conversation_history
+        for chunk in stream:
+            # Only rescan the tail that could hold a phrase split across chunks
+            scan_from = max(0, len(response) - ESCALATION_SCAN_OVERLAP)
+            response += chunk
+            if committed:
+                yield chunk
+                continue
+            if partial_requests_escalation(response[scan_from:]):
+                elapsed = time.time() - start_time
+                print(f"⚡ Escalation detected in partial Ollama output after {elapsed:.2f}s, aborting local model")
+                break
+            if window is not None and len(response) >= window and split_sentences(response)[0]:
+                committed = True
+                yield response
+    finally:
+        # Closing the generator drops the HTTP stream so Ollama stops generating
+        stream.close()
+        outcome.update(response=response or None, committed=committed)
+
+def query_ollama(question, conversation_history, model=None, cancel_event=None):
+    """Query Ollama local model with proper Jarvis system prompt.
+    
+    Generation is aborted as soon as the partial output asks for escalation. The
+    partial text is returned as-is, so should_escalate_to_cloud still escalates on it.
+    """
+    outcome = {}
+    for _ in stream_local_answer(question, conversation_history, model, cancel_event, outcome):
+        pass
+    return outcome["response"]
+
+def stream_ollama(question, conversation_history, model=None, cancel_event=None):
+    """Stream the Ollama local model response, yielding text chunks as they arrive.
+    
+    Yields nothing if Ollama is unreachable, fails or the circuit breaker is open,
+    callers treat an empty result the same way as query_ollama returning None.
+    Setting cancel_event from another thread drops the request mid-stream.
+    """
+    if model is None:
+        model = OLLAMA_MODEL
         
-        for msg in recent_history:
-            if msg['role'] == 'user':
-                context += f"User: {msg['content']}\n"
-            else:
-                context += f"Jarvis: {msg['content']}\n"
+    start_time = time.time()
+    provider = "OpenAI" if USE_OPENAI else "Claude"
+    
+    if not ollama_breaker.allow_request():
+        print(f"⚡ Ollama circuit {ollama_breaker.state}, sending straight to {provider}...")
+        return
+    outcome_recorded = False
+    inference_start = None
+    span = {"backend": "ollama", "model": model}
+    
+    try:
+        # Health is kept current by the background prober, no extra round trip here
+        with tracer.span("ollama_health") as health_span:
+            healthy = health_span["healthy"] = ollama_client.is_healthy()
+        if not healthy:
+            print(f"❌ Ollama marked unhealthy, escalating to {provider}...")
+            return
         
-        # Add current question
-        context += f"User: {question}\nJarvis:"
+        messages, context_stats = build_ollama_messages(question, conversation_history)
         
-        # Time the actual inference
+        # Deadline derived from recent Ollama latency instead of a flat 30s
+        timeout = ollama_breaker.timeout()
         inference_start = time.time()
-        url = f"{OLLAMA_BASE_URL}/api/generate"
+        first_token_time = None
+        final_chunk = {}
         data = {
             "model": model,
-            "prompt": context,
-            "stream": False
+            "messages": messages,
+            "stream": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE
         }
         
-        response = requests.post(url, json=data, timeout=30)
+        with ollama_client.post("/api/chat", json=data, timeout=(OLLAMA_CONNECT_TIMEOUT, timeout), stream=True) as response:
+            if response.status_code != 200:
+                elapsed = time.time() - start_time
+                print(f"❌ Ollama failed after {elapsed:.2f}s (Status: {response.status_code})")
+                span["error"] = f"status {response.status_code}"
+                ollama_breaker.record_failure(f"status {response.status_code}")
+                outcome_recorded = True
+                return
+            
+            # Ollama streams one JSON object per line
+            for line in response.iter_lines():
+                if cancel_event is not None and cancel_event.is_set():
+                    # Closing the response drops the connection and stops generation
+                    print(f"🛑 Ollama request cancelled after {time.time() - start_time:.2f}s")
+                    span["cancelled"] = True
+                    return
+                if time.time() - inference_start > timeout:
+                    raise requests.exceptions.Timeout(f"no complete answer within {timeout:.1f}s")
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                text = chunk.get("message", {}).get("content", "")
+                if text:
+                    if first_token_time is None:
+                        first_token_time = time.time()
+                    yield text
+                if chunk.get("done"):
+                    final_chunk = chunk
+                    break
+        
         inference_end = time.time()
+        total_time = inference_end - start_time
+        inference_time = inference_end - inference_start
+        overhead_time = total_time - inference_time
+        # Judged on time to first token, less any cold model load, so answer length does not count
+        load_seconds = final_chunk.get("load_duration", 0) / 1e9
+        response_time = (first_token_time or inference_end) - inference_start
+        ollama_breaker.record_success(inference_time, max(0.0, response_time - load_seconds))
+        outcome_recorded = True
+        span.update(
+            ttft=None if first_token_time is None else round(first_token_time - inference_start, 3),
+            prompt_tokens=final_chunk.get("prompt_eval_count"),
+            completion_tokens=final_chunk.get("eval_count"),
+            load=round(final_chunk.get("load_duration", 0) / 1e9, 3) if final_chunk else None
+        )
         
-        if response.status_code == 200:
-            total_time = time.time() - start_time
-            inference_time = inference_end - inference_start
-            overhead_time = total_time - inference_time
-            
-            # Log timing information
-            print(f"🤖 Ollama Timing:")
-            print(f"   Total time: {total_time:.2f}s")
-            print(f"   Inference time: {inference_time:.2f}s") 
-            print(f"   Overhead time: {overhead_time:.2f}s")
-            print(f"   Model: {model}")
-            print(f"   Location: Remote ({OLLAMA_BASE_URL})")
-            
-            return response.json()["response"]
-        else:
-            elapsed = time.time() - start_time
-            print(f"❌ Ollama failed after {elapsed:.2f}s (Status: {response.status_code})")
-            return None
+        # Log timing information
+        print(f"🤖 Ollama Timing:")
+        print(f"   Total time: {total_time:.2f}s")
+        if first_token_time is not None:
+            print(f"   Time to first token: {first_token_time - start_time:.2f}s")
+        print(f"   Inference time: {inference_time:.2f}s") 
+        print(f"   Overhead time: {overhead_time:.2f}s")
+        print(f"   Model: {model}")
+        print(f"   Location: Remote ({OLLAMA_BASE_URL})")
+        print(f"   Prompt tokens: {ContextBuilder.describe(context_stats)}")
+        if final_chunk:
+            print(f"   Model load: {describe_ollama_load(final_chunk)}")
+        print(f"   Breaker: {ollama_breaker.describe()}")
             
     except requests.exceptions.Timeout:
         elapsed = time.time() - start_time
-        provider = "OpenAI" if USE_OPENAI else "Claude"
         print(f"⏰ Ollama timeout after {elapsed:.2f}s, escalating to {provider}...")
-        return None
+        span["error"] = "timeout"
+        ollama_breaker.record_failure("timeout")
+        outcome_recorded = True
+        ollama_client.mark_unhealthy()
     except requests.exceptions.ConnectionError:
         elapsed = time.time() - start_time
-        provider = "OpenAI" if USE_OPENAI else "Claude"
         print(f"🔌 Ollama connection failed after {elapsed:.2f}s, escalating to {provider}...")
-        return None
+        span["error"] = "connection failed"
+        ollama_breaker.record_failure("connection failed")
+        outcome_recorded = True
+        ollama_client.mark_unhealthy()
     except Exception as e:
         elapsed = time.time() - start_time
         print(f"💥 Ollama error after {elapsed:.2f}s: {e}")
-        return None
+        span["error"] = type(e).__name__
+        ollama_breaker.record_failure(str(e))
+        outcome_recorded = True
+    except GeneratorExit:
+        # The caller stopped reading, e.g. an escalation phrase was spotted
+        span["cancelled"] = True
+        raise
+    finally:
+        # Skipped or abandoned calls say nothing about Ollama's health
+        if not outcome_recorded:
+            ollama_breaker.release()
+        if inference_start is not None:
+            tracer.record("inference", time.time() - inference_start, start=inference_start, **span)
+
+# Phrases in a local answer that mean the cloud should take over
+ESCALATION_PHRASES = ["escalate this to my advanced systems", "i don't know", "i don’t know"]
+REFUSAL_PATTERNS = ["i can't", "i can’t"]
+ESCALATION_SCAN_OVERLAP = max(len(phrase) for phrase in ESCALATION_PHRASES + REFUSAL_PATTERNS)
+
+def partial_requests_escalation(partial_response):
+    """Check a (possibly incomplete) local answer for escalation phrases or refusals"""
+    partial_lower = partial_response.lower()
+    return any(phrase in partial_lower for phrase in ESCALATION_PHRASES + REFUSAL_PATTERNS)
 
 def should_escalate_to_cloud(question, ollama_response=None):
     
@@ -213,70 +700,465 @@ def should_escalate_to_cloud(question, ollama_response=None):
     if ollama_response is None:
         return False
         
-    # Escalate if ollama explicitly says to escalate
-    escalation_phrases = ["escalate this to my advanced systems", "i don't know"]
-    if any(phrase in ollama_response.lower() for phrase in escalation_phrases):
+    # Escalate if ollama explicitly says to escalate or refuses
+    if partial_requests_escalation(ollama_response):
         return True
         
     # Escalate if response seems incomplete/unhelpful
-    if len(ollama_response.strip()) < 5 or "i can't" in ollama_response.lower():
+    if len(ollama_response.strip()) < 5:
         return True
         
     return False
 
-def ask_question_memory(question, conversation_history):
+def choose_route(question):
+    """Decide before any model call whether the local model should be skipped.
+    
+    A trained router decides when it is confident either way, otherwise the
+    escalation keyword list is the fallback. Explicit provider mentions always
+    go to the cloud.
+    """
+    with tracer.span("routing") as span:
+        intents = classify_intents(question)
+        keyword_hit = should_escalate_immediately(question, intents)
+        router = escalation_router.get()
+        probability = router.predict_proba(question) if router else None
+        route = {"keyword_hit": keyword_hit, "probability": probability}
+        
+        if "explicit_cloud" in intents:
+            route.update(skip_local=True, reason="API hot word detected")
+        elif probability is not None and probability >= ROUTER_THRESHOLD:
+            route.update(skip_local=True, reason=f"Router predicts escalation (p={probability:.2f})")
+        elif probability is not None and probability <= 1 - ROUTER_THRESHOLD:
+            route.update(skip_local=False, reason=f"Router predicts a local answer (p={probability:.2f})")
+        elif keyword_hit:
+            route.update(skip_local=True, reason="API hot word detected")
+        else:
+            route.update(skip_local=False, reason="No escalation signal")
+        span["route"] = "cloud" if route["skip_local"] else "local"
+        return route
+
+def log_routing_outcome(question, route, ollama_escalated=None, ollama_latency=None, cloud_latency=None, total_latency=None):
+    """Record a routing decision and what happened, for offline router training"""
+    if routing_log is None:
+        return
+    routing_log.record(
+        features=hashed_features(question),
+        keyword_hit=route["keyword_hit"],
+        router_probability=route["probability"],
+        route="cloud" if route["skip_local"] else "local",
+        reason=route["reason"],
+        ollama_escalated=ollama_escalated,
+        ollama_latency=ollama_latency,
+        cloud_latency=cloud_latency,
+        total_latency=total_latency
+    )
+
+def route_question(question, conversation_history):
+    """Answer from the local model or the cloud, whichever the route picks"""
+    return "".join(route_question_stream(question, conversation_history))
+
+def route_question_stream(question, conversation_history, cancel_event=None):
+    """Answer from the local model or the cloud, whichever the route picks, yields response text chunks.
+    
+    A local answer streams once it is past the escalation window. Setting
+    cancel_event from another thread aborts whichever model call is in flight.
+    """
+    route = choose_route(question)
+    if HEDGED_ROUTING and not route["skip_local"]:
+        yield from ask_question_memory_hedged_stream(question, conversation_history, route, cancel_event)
+        return
+    
     total_start_time = time.time()
+    yielded = False
+    local = {}
     
     try:
-        skip_llama = False
-        if should_escalate_immediately(question): 
-            skip_llama = True
-            print(f"🔥 API hot word detected, skipping local model")
+        ollama_response = None
+        ollama_latency = None
+        if route["skip_local"]: 
+            print(f"🔥 {route['reason']}, skipping local model")
         else:
             print("Checking with local model...")
-            ollama_response = query_ollama(question, conversation_history)
+            ollama_start_time = time.time()
+            try:
+                yield from stream_local_answer(question, conversation_history, cancel_event=cancel_event,
+                                               outcome=local, window=LOCAL_ESCALATION_WINDOW)
+            finally:
+                # Streamed text may already have been spoken, so it is kept even if the caller stops early
+                if local.get("committed"):
+                    conversation_history.append(history_message('user', question))
+                    conversation_history.append(history_message('assistant', local["response"]))
+            ollama_response = local["response"]
+            ollama_latency = time.time() - ollama_start_time
+            if cancel_event is not None and cancel_event.is_set():
+                return
         
-        if not skip_llama and ollama_response and not should_escalate_to_cloud(question, ollama_response):
+        local_accepted = local.get("committed") or (
+            ollama_response is not None and not should_escalate_to_cloud(question, ollama_response))
+        ollama_escalated = None if route["skip_local"] else not local_accepted
+        
+        if local_accepted:
             total_time = time.time() - total_start_time
             print(f"✅ Using local model response (Total: {total_time:.2f}s)")
-            conversation_history.append({'role': 'user', 'content': question})
-            conversation_history.append({'role': 'assistant', 'content': ollama_response})
-            return ollama_response
+            log_routing_outcome(question, route, ollama_escalated, ollama_latency, None, total_time)
+            if not local["committed"]:
+                # Short enough to finish inside the escalation window
+                conversation_history.append(history_message('user', question))
+                conversation_history.append(history_message('assistant', ollama_response))
+                yielded = True
+                yield ollama_response
         else:
             provider = "OpenAI" if USE_OPENAI else "Claude"
             print(f"📡 Escalating to {provider} API...")
-            cloud_response = ask_cloud_api(question, conversation_history)
+            cloud_start_time = time.time()
+            for chunk in stream_cloud_api(question, conversation_history, cancel_event):
+                yielded = True
+                yield chunk
             total_time = time.time() - total_start_time
             print(f"🌐 Total query time (including escalation): {total_time:.2f}s")
-            return cloud_response
+            log_routing_outcome(question, route, ollama_escalated, ollama_latency, time.time() - cloud_start_time, total_time)
             
     except Exception as e:
         total_time = time.time() - total_start_time
         print(f"💥 Error in question processing after {total_time:.2f}s: {e}")
-        # Fallback to cloud API if anything goes wrong
-        return ask_cloud_api(question, conversation_history)
+        # Fallback to cloud API only if nothing has been handed to the caller yet
+        if not (yielded or local.get("committed")) and not (cancel_event is not None and cancel_event.is_set()):
+            yield from stream_cloud_api(question, conversation_history, cancel_event)
+
+def response_cache_key(question, conversation_history, intents=None):
+    """(cache key, TTL) for a question, or (None, None) when its answer must not be cached"""
+    if intents is None:
+        intents = classify_intents(strip_timestamp(question))
+    if "time_sensitive" in intents:
+        return None, None
+    normalized = ResponseCache.normalize(question)
+    if not normalized:
+        return None, None
+
+    # The same question can get a different answer from another backend
+    fingerprint = f"{'openai' if USE_OPENAI else 'claude'}:{OLLAMA_MODEL}"
+    if "context_dependent" in intents:
+        # "Explain it again" means something else after every exchange
+        fingerprint += "\n" + "\n".join(strip_timestamp(message_text(message)) for message in conversation_history[-2:])
+    ttl = min((RESPONSE_CACHE_TTLS[intent] for intent in intents if intent in RESPONSE_CACHE_TTLS),
+              default=RESPONSE_CACHE_TTL)
+    return ResponseCache.make_key(normalized, fingerprint), ttl
+
+def is_request_failure(text):
+    """Error message a cloud call returns in place of an answer"""
+    return text.startswith(("The OpenAI request failed: ", "The Claude request failed: "))
 
-def ask_openai_api(question, conversation_history):
-    """OpenAI API function with timing"""
+def is_cacheable_answer(answer):
+    """Device commands ('#') and failed requests are never replayed"""
+    return bool(answer) and "#" not in answer and not is_request_failure(answer)
+
+def cached_answer(question, conversation_history):
+    """Cached answer for a question, recorded in the history like a fresh one. Returns (answer, key, ttl)"""
+    if not RESPONSE_CACHE:
+        return None, None, None
+    key, ttl = response_cache_key(question, conversation_history)
+    if key is None:
+        response_cache.bypass()
+        return None, None, None
+    hit = response_cache.get(key)
+    if hit is None:
+        return None, key, ttl
+    answer, latency = hit
+    print(f"💾 Cached answer, saved ~{latency:.2f}s ({response_cache.describe()})")
+    conversation_history.append(history_message('user', question))
+    conversation_history.append(history_message('assistant', answer))
+    return answer, key, ttl
+
+def ask_question_memory(question, conversation_history, cacheable=True):
+    """Answer a question, repeats within their TTL come from the response cache"""
+    answer, key, ttl = cached_answer(question, conversation_history) if cacheable else (None, None, None)
+    if answer is not None:
+        return answer
     start_time = time.time()
+    answer = route_question(question, conversation_history)
+    if key is not None and is_cacheable_answer(answer):
+        response_cache.put(key, answer, ttl, time.time() - start_time)
+    return answer
+
+def ask_question_memory_stream(question, conversation_history, cacheable=True, cancel_event=None):
+    """Streaming ask_question_memory, yields response text chunks. cancel_event aborts the model call"""
+    answer, key, ttl = cached_answer(question, conversation_history) if cacheable else (None, None, None)
+    if answer is not None:
+        yield answer
+        return
+
+    # Only time spent producing chunks counts, not the time the caller spends speaking them
+    chunks = []
+    busy = 0.0
+    chunk_start = time.time()
+    for chunk in route_question_stream(question, conversation_history, cancel_event):
+        busy += time.time() - chunk_start
+        chunks.append(chunk)
+        yield chunk
+        chunk_start = time.time()
+    busy += time.time() - chunk_start
+
+    answer = "".join(chunks)
+    # An interrupted answer is incomplete
+    if cancel_event is not None and cancel_event.is_set():
+        return
+    if key is not None and is_cacheable_answer(answer):
+        response_cache.put(key, answer, ttl, busy)
+
+def is_borderline_question(question, probability=None):
+    """Questions the local model is likely to struggle with get hedged immediately"""
+    if len(question.split()) > HEDGE_BORDERLINE_WORDS:
+        return True
+    # The router leans towards escalation without being confident enough to skip local
+    if probability is not None and probability >= 0.5:
+        return True
+    # A recovering local tier is not trusted to answer on its own yet
+    return ollama_breaker.state != CircuitBreaker.CLOSED
+
+def ask_question_memory_hedged_stream(question, conversation_history, route=None, cancel_event=None):
+    """Race the local model against a delayed cloud request, yields the winner's chunks.
+    
+    The cloud request starts after HEDGE_DELAY seconds (immediately for borderline
+    questions) unless the local answer has already been accepted. An acceptable local
+    answer wins if it completes before the cloud produces its first token, otherwise
+    the cloud wins. The loser is cancelled and only the winner reaches the history.
+    """
+    if route is None:
+        route = choose_route(question)
+    total_start_time = time.time()
+    provider = "OpenAI" if USE_OPENAI else "Claude"
+    events = queue.Queue()
+    local_outcome = {}
+    local_cancel = threading.Event()
+    cloud_cancel = threading.Event()
+    
+    def run_local():
+        local_start_time = time.time()
+        response = query_ollama(question, conversation_history, cancel_event=local_cancel)
+        acceptable = response is not None and not should_escalate_to_cloud(question, response)
+        # A cancelled local call says nothing about whether it would have escalated
+        if not local_cancel.is_set():
+            local_outcome.update(escalated=not acceptable, latency=time.time() - local_start_time)
+        events.put(("local", response if acceptable else None))
+    
+    def run_cloud():
+        try:
+            # Not recorded, so a losing answer never lands in history
+            for chunk in stream_cloud_api(question, conversation_history, cancel_event=cloud_cancel, record=False):
+                # A failed request yields its error as the only chunk, that must not win the race
+                events.put(("cloud_failed" if is_request_failure(chunk) else "cloud_chunk", chunk))
+        finally:
+            events.put(("cloud_done", None))
+    
+    def start_cloud(reason):
+        print(f"🪁 Hedging: {reason}, starting {provider} in parallel...")
+        threading.Thread(target=run_in_context(run_cloud), name="hedge-cloud", daemon=True).start()
+    
+    def next_event(timeout=None):
+        """events.get that returns None once cancel_event is set, raises queue.Empty on timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        while cancel_event is None or not cancel_event.is_set():
+            wait = None if cancel_event is None else HEDGE_CANCEL_POLL
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return events.get_nowait()
+                wait = remaining if wait is None else min(wait, remaining)
+            try:
+                return events.get(timeout=wait)
+            except queue.Empty:
+                if deadline is not None and time.time() >= deadline:
+                    raise
+        return None
+    
+    print("Checking with local model (hedged)...")
+    threading.Thread(target=run_in_context(run_local), name="hedge-local", daemon=True).start()
+    
+    hedge_delay = 0 if is_borderline_question(question, route["probability"]) else HEDGE_DELAY
+    cloud_start_time = None
+    hedge_deadline = total_start_time + hedge_delay
+    cloud_started = False
+    local_failed = False
+    cloud_finished = False
+    cloud_error = None
+    winner = None
+    first_chunk = None
     
     try:
-        conversation_history.append({'role': 'user', 'content': question})
+        while winner is None:
+            timeout = None if cloud_started else max(0, hedge_deadline - time.time())
+            try:
+                event = next_event(timeout)
+            except queue.Empty:
+                reason = "borderline question" if hedge_delay == 0 else f"no local answer after {hedge_delay:.1f}s"
+                start_cloud(reason)
+                cloud_started = True
+                cloud_start_time = time.time()
+                continue
+            if event is None:
+                print("🛑 Hedged request cancelled")
+                return
+            
+            kind, payload = event
+            if kind == "local":
+                if payload:
+                    winner = "local"
+                    first_chunk = payload
+                    cloud_cancel.set()
+                else:
+                    local_failed = True
+                    if not cloud_started:
+                        start_cloud("local answer not acceptable")
+                        cloud_started = True
+                        cloud_start_time = time.time()
+            elif kind == "cloud_chunk":
+                winner = "cloud"
+                first_chunk = payload
+                local_cancel.set()
+            elif kind == "cloud_failed":
+                cloud_error = payload
+            elif kind == "cloud_done":
+                cloud_finished = True
+            if local_failed and cloud_finished and winner is None:
+                # Both sides failed, in whichever order
+                break
         
-        # OpenAI format includes system message in messages array
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT}
-        ]
-        messages.extend(conversation_history)
+        if winner is None:
+            print(f"❌ Hedged race lost by both models (Total: {time.time() - total_start_time:.2f}s)")
+            if cloud_error:
+                yield cloud_error
+            return
+        
+        if winner == "local":
+            total_time = time.time() - total_start_time
+            print(f"✅ Hedged race won by local model (Total: {total_time:.2f}s)")
+            conversation_history.append(history_message('user', question))
+            conversation_history.append(history_message('assistant', first_chunk))
+            log_routing_outcome(question, route, local_outcome.get("escalated"), local_outcome.get("latency"), None, total_time)
+            yield first_chunk
+            return
+        
+        if winner == "cloud":
+            chunks = [first_chunk]
+            yield first_chunk
+            while True:
+                event = next_event()
+                if event is None:
+                    print("🛑 Hedged request cancelled")
+                    return
+                kind, payload = event
+                if kind == "cloud_chunk":
+                    chunks.append(payload)
+                    yield payload
+                elif kind == "cloud_done":
+                    break
+            total_time = time.time() - total_start_time
+            print(f"🌐 Hedged race won by {provider} (Total: {total_time:.2f}s)")
+            conversation_history.append(history_message('user', question))
+            conversation_history.append(history_message('assistant', "".join(chunks)))
+            log_routing_outcome(question, route, local_outcome.get("escalated"), local_outcome.get("latency"),
+                                time.time() - cloud_start_time, total_time)
+    finally:
+        # Whatever is still running lost the race, or the caller stopped listening
+        local_cancel.set()
+        cloud_cancel.set()
+
+def build_openai_messages(system_parts, window):
+    """OpenAI messages with a byte-stable prefix so provider-side prompt caching hits"""
+    # The fixed system prompt comes first on its own; the rolling summary only
+    # changes when turns are folded, so it goes in a second system message
+    messages = [{"role": "system", "content": part} for part in system_parts]
+    messages.extend(window)
+    return messages
+
+def build_claude_request(system_parts, window):
+    """Claude system blocks and messages with prompt caching breakpoints"""
+    system = [{"type": "text", "text": part} for part in system_parts]
+    messages = [dict(message) for message in window]
+    if not PROMPT_CACHING:
+        return system, messages
+    
+    # Breakpoints: the fixed system prompt, the rolling summary and the end of the
+    # history. The next turn reads everything up to here from the cache.
+    for block in system:
+        block["cache_control"] = {"type": "ephemeral"}
+    if messages:
+        last = messages[-1]
+        last["content"] = [{"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}}]
+    return system, messages
+
+def describe_openai_cache(usage):
+    """Cached prompt token summary for the OpenAI timing output"""
+    if usage is None:
+        return "no usage reported"
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    status = "hit" if cached else "miss"
+    return f"{status}, read {cached} of {usage.prompt_tokens} prompt tokens"
+
+def describe_claude_cache(usage):
+    """Cache read/write token summary for the Claude timing output"""
+    if usage is None:
+        return "no usage reported"
+    read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    status = "hit" if read else "miss"
+    return f"{status}, read {read} / write {written} / uncached {usage.input_tokens} input tokens"
+
+def usage_fields(usage):
+    """Token counts from an OpenAI or Anthropic usage object, for trace spans"""
+    if usage is None:
+        return {}
+    prompt = getattr(usage, "prompt_tokens", None)
+    if prompt is None:
+        prompt = getattr(usage, "input_tokens", None)
+    completion = getattr(usage, "completion_tokens", None)
+    if completion is None:
+        completion = getattr(usage, "output_tokens", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details else getattr(usage, "cache_read_input_tokens", None)
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "cached_tokens": cached}
+
+def stream_openai_api(question, conversation_history, cancel_event=None, record=True):
+    """OpenAI streaming API function with timing, yields text chunks"""
+    start_time = time.time()
+    chunks = []
+    api_start = None
+    span = {"backend": "openai", "model": MODEL_NAME}
+    
+    try:
+        system_parts, window, context_stats = build_context(question, conversation_history, "openai", SYSTEM_PROMPT, record)
+        messages = build_openai_messages(system_parts, window)
         
         # Time the actual API call
         api_start = time.time()
-        response = client.chat.completions.create(
+        first_token_time = None
+        usage = None
+        stream = cloud_client.get().chat.completions.create(
             model=MODEL_NAME,
             messages=messages,
             max_tokens=1000,
-            temperature=0.7
+            temperature=0.7,
+            stream=True,
+            stream_options={"include_usage": True}
         )
+        for event in stream:
+            if cancel_event is not None and cancel_event.is_set():
+                stream.close()
+                print(f"🛑 OpenAI request cancelled after {time.time() - start_time:.2f}s")
+                span["cancelled"] = True
+                return
+            # Usage arrives on a final event without choices
+            if event.usage is not None:
+                usage = event.usage
+            if not event.choices:
+                continue
+            text = event.choices[0].delta.content
+            if text:
+                if first_token_time is None:
+                    first_token_time = time.time()
+                chunks.append(text)
+                yield text
         api_end = time.time()
         
         total_time = time.time() - start_time
@@ -284,41 +1166,68 @@ def ask_openai_api(question, conversation_history):
         overhead_time = total_time - api_time
         
         # Log timing information
-        print(f"🌐 OpenAI Timing:")
+        print(f"🌐 OpenAI Timing (streamed):")
         print(f"   Total time: {total_time:.2f}s")
+        if first_token_time is not None:
+            print(f"   Time to first token: {first_token_time - start_time:.2f}s")
         print(f"   API call time: {api_time:.2f}s")
         print(f"   Overhead time: {overhead_time:.2f}s")
         print(f"   Model: {MODEL_NAME}")
         print(f"   Location: Cloud")
-        
-        assistant_message = response.choices[0].message.content
-        conversation_history.append({'role': 'assistant', 'content': assistant_message})
-        
-        return assistant_message
+        print(f"   Prompt tokens: {ContextBuilder.describe(context_stats)}")
+        print(f"   Prompt cache: {describe_openai_cache(usage)}")
+        span.update(usage_fields(usage), ttft=None if first_token_time is None else round(first_token_time - api_start, 3))
     except Exception as e:
         elapsed = time.time() - start_time
         print(f"❌ OpenAI API error after {elapsed:.2f}s: {e}")
-        return f"The OpenAI request failed: {e}"
+        span["error"] = type(e).__name__
+        if not chunks:
+            message = f"The OpenAI request failed: {e}"
+            chunks.append(message)
+            yield message
+    except GeneratorExit:
+        span["cancelled"] = True
+        raise
+    finally:
+        # Record whatever was generated, even if the caller stopped early
+        if chunks and record:
+            conversation_history.append(history_message('assistant', "".join(chunks)))
+        if api_start is not None:
+            tracer.record("cloud", time.time() - api_start, start=api_start, **span)
 
-def ask_claude_api(question, conversation_history):
-    """Anthropic Claude API function with timing"""
+def stream_claude_api(question, conversation_history, cancel_event=None, record=True):
+    """Anthropic Claude streaming API function with timing, yields text chunks"""
     start_time = time.time()
+    chunks = []
+    api_start = None
+    span = {"backend": "claude", "model": MODEL_NAME}
     
     try:
-        conversation_history.append({'role': 'user', 'content': question})
-        
-        messages = []
-        messages.extend(conversation_history)
+        system_parts, window, context_stats = build_context(question, conversation_history, "claude", SYSTEM_PROMPT, record)
+        system, messages = build_claude_request(system_parts, window)
         
         # Time the actual API call
         api_start = time.time()
-        response = client.messages.create(
+        first_token_time = None
+        with cloud_client.get().messages.stream(
             model=MODEL_NAME,
             messages=messages,
-            system=SYSTEM_PROMPT,
+            system=system,
             max_tokens=1000,
             temperature=0.7
-        )
+        ) as stream:
+            for text in stream.text_stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    print(f"🛑 Claude request cancelled after {time.time() - start_time:.2f}s")
+                    span["cancelled"] = True
+                    return
+                if not text:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.time()
+                chunks.append(text)
+                yield text
+            usage = stream.get_final_message().usage
         api_end = time.time()
         
         total_time = time.time() - start_time
@@ -326,70 +1235,223 @@ def ask_claude_api(question, conversation_history):
         overhead_time = total_time - api_time
         
         # Log timing information
-        print(f"🌐 Claude Timing:")
+        print(f"🌐 Claude Timing (streamed):")
         print(f"   Total time: {total_time:.2f}s")
+        if first_token_time is not None:
+            print(f"   Time to first token: {first_token_time - start_time:.2f}s")
         print(f"   API call time: {api_time:.2f}s")
         print(f"   Overhead time: {overhead_time:.2f}s")
         print(f"   Model: {MODEL_NAME}")
         print(f"   Location: Cloud")
-        
-        assistant_message = response.content[0].text
-        conversation_history.append({'role': 'assistant', 'content': assistant_message})
-        
-        return assistant_message
+        print(f"   Prompt tokens: {ContextBuilder.describe(context_stats)}")
+        print(f"   Prompt cache: {describe_claude_cache(usage)}")
+        span.update(usage_fields(usage), ttft=None if first_token_time is None else round(first_token_time - api_start, 3))
     except Exception as e:
         elapsed = time.time() - start_time
         print(f"❌ Claude API error after {elapsed:.2f}s: {e}")
-        return f"The Claude request failed: {e}"
+        span["error"] = type(e).__name__
+        if not chunks:
+            message = f"The Claude request failed: {e}"
+            chunks.append(message)
+            yield message
+    except GeneratorExit:
+        span["cancelled"] = True
+        raise
+    finally:
+        # Record whatever was generated, even if the caller stopped early
+        if chunks and record:
+            conversation_history.append(history_message('assistant', "".join(chunks)))
+        if api_start is not None:
+            tracer.record("cloud", time.time() - api_start, start=api_start, **span)
 
-def ask_cloud_api(question, conversation_history):
-    """Router function that calls the appropriate API based on USE_OPENAI flag"""
+def stream_cloud_api(question, conversation_history, cancel_event=None, record=True):
+    """Streaming router that calls the appropriate API based on USE_OPENAI flag"""
     if USE_OPENAI:
-        return ask_openai_api(question, conversation_history)
+        return stream_openai_api(question, conversation_history, cancel_event, record)
     else:
-        return ask_claude_api(question, conversation_history)
-
-async def generate_tts(sentence, speech_file_path):
-    try:
-        communicate = edge_tts.Communicate(sentence, 'en-AU-WilliamNeural')
-        await communicate.save(speech_file_path)
-        return str(speech_file_path)
-    except Exception as e:
-        print(f"TTS Error: {e}")
-        return None
-
-def play_sound(file_path):
-    if not AUDIO_OUTPUT_AVAILABLE:
-        print("🔇 Audio playback skipped (no audio hardware)")
-        return
-        
-    if file_path:
-        try:
-            mixer.music.load(file_path)
-            mixer.music.play()
-        except Exception as e:
-            print(f"Sound playback error: {e}")
+        return stream_claude_api(question, conversation_history, cancel_event, record)
 
 def tts_caller(text: str):
-    if not AUDIO_OUTPUT_AVAILABLE:
+    tts_engine = get_tts_engine()
+    if tts_engine is None:
         print(f"🔇 TTS skipped: {text}")
         return "skipped"
         
     try:
-        speech_file_path = "speech.mp3"
         cleaned_string = clean_up_tts_string(text)
-        asyncio.run(generate_tts(cleaned_string, speech_file_path))
-        if os.path.exists(speech_file_path):
-            play_sound(speech_file_path)
-            while mixer.music.get_busy():
-                time.sleep(1)
-            mixer.music.unload()
-            os.remove(speech_file_path)
+        tts_engine.speak(cleaned_string)
         return "done"
     except Exception as e:
         print(f"TTS processing error: {e}")
         return "error"
 
+# Sentence N+1 is synthesized while sentence N plays; the bounded queue keeps
+# synthesis from running too far ahead of playback
+TTS_PLAYBACK_QUEUE_SIZE = 2
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+def split_sentences(text: str):
+    """Split text into complete sentences and the trailing unfinished remainder"""
+    parts = SENTENCE_BOUNDARY.split(text)
+    sentences = [part.strip() for part in parts[:-1] if part.strip()]
+    return sentences, parts[-1]
+
+def tts_stream_caller(text_chunks, echo_prefix=None):
+    """Speak text sentence by sentence as it arrives, blocking until playback ends.
+    
+    Accepts a string or an iterable of text chunks (e.g. ask_question_memory_stream),
+    which is read on worker threads and spoken by speak_stream_async. The input is
+    always drained so streamed responses are fully recorded. Returns the full response text.
+    """
+    if isinstance(text_chunks, str):
+        text_chunks = [text_chunks]
+    chunk_iterator = iter(text_chunks)
+    end = object()
+    
+    async def chunks():
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, run_in_context(next, chunk_iterator, end))
+            if chunk is end:
+                return
+            yield chunk
+    
+    try:
+        return asyncio.run(speak_stream_async(chunks(), echo_prefix=echo_prefix))
+    except Exception as e:
+        print(f"TTS processing error: {e}")
+        return ""
+
+async def speak_stream_async(text_chunks, cancel_event=None, echo_prefix=None):
+    """Speak an async iterable of text chunks sentence by sentence as they arrive.
+    
+    Synthesis and playback run as two tasks fed by queues, so sentence N+1 is
+    synthesized while sentence N plays and the next chunks are still arriving.
+    Cancelling the calling task, or setting cancel_event, stops playback mid-clip.
+    Returns the text received.
+    """
+    loop = asyncio.get_running_loop()
+    tts_engine = await loop.run_in_executor(None, get_tts_engine)
+    sentence_queue = asyncio.Queue()
+    playback_queue = asyncio.Queue(maxsize=TTS_PLAYBACK_QUEUE_SIZE)
+    
+    async def synthesize():
+        while True:
+            sentence = await sentence_queue.get()
+            if sentence is None:
+                await playback_queue.put(None)
+                return
+            audio = await loop.run_in_executor(None, run_in_context(tts_engine.synthesize, sentence))
+            if audio:
+                await playback_queue.put(audio)
+    
+    async def play():
+        while True:
+            audio = await playback_queue.get()
+            if audio is None:
+                return
+            try:
+                await asyncio.wrap_future(tts_engine.play(audio))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Already reported by the engine, move on to the next sentence
+                pass
+    
+    workers = []
+    if tts_engine is not None:
+        workers = [asyncio.create_task(synthesize()), asyncio.create_task(play())]
+    
+    def queue_sentence(sentence):
+        cleaned_string = clean_up_tts_string(sentence).strip()
+        if cleaned_string and workers:
+            sentence_queue.put_nowait(cleaned_string)
+    
+    full_text = []
+    speech_buffer = ""
+    speaking = True
+    
+    try:
+        async for chunk in text_chunks:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if echo_prefix is not None and not full_text:
+                print(echo_prefix, end="", flush=True)
+            full_text.append(chunk)
+            if not speaking:
+                continue
+            
+            # Everything after the device-command marker is not spoken
+            if '#' in chunk:
+                chunk = chunk.split('#')[0]
+                speaking = False
+            if echo_prefix is not None:
+                print(chunk, end="", flush=True)
+            
+            speech_buffer += chunk
+            sentences, speech_buffer = split_sentences(speech_buffer)
+            for sentence in sentences:
+                queue_sentence(sentence)
+        
+        if cancel_event is None or not cancel_event.is_set():
+            queue_sentence(speech_buffer)
+            sentence_queue.put_nowait(None)
+            await asyncio.gather(*workers)
+    finally:
+        if echo_prefix is not None and full_text:
+            print()
+        unfinished = [worker for worker in workers if not worker.done()]
+        if unfinished:
+            # Interrupted: drop queued sentences and cut the clip that is playing
+            for worker in unfinished:
+                worker.cancel()
+            tts_engine.stop()
+    
+    if tts_engine is None:
+        print("🔇 TTS skipped (no audio hardware)")
+    
+    return "".join(full_text)
+
+def interrupt_speech():
+    """Cut off whatever is playing, used when the user talks over Jarvis"""
+    tts_engine = audio_output.peek()
+    if tts_engine is not None:
+        tts_engine.stop()
+
+def render_speech(text):
+    """Synthesize text to mp3 bytes ahead of time, None without audio output"""
+    tts_engine = get_tts_engine()
+    if tts_engine is None:
+        return None
+    return tts_engine.synthesize(clean_up_tts_string(text))
+
+def play_speech(audio):
+    """Start playing pre-rendered audio, returns a Future or None if there is nothing to play"""
+    tts_engine = audio_output.peek()
+    if tts_engine is None or not audio:
+        return None
+    return tts_engine.play(audio)
+
+def warm_speech_cache(phrases):
+    """Pre-render fixed phrases into the speech cache on a background thread"""
+    if not TTS_CACHE_WARMUP:
+        return None
+    
+    def warm_up():
+        # Waiting for audio output to initialize happens here, off the main thread
+        tts_engine = get_tts_engine()
+        if tts_engine is None or not tts_engine.cache:
+            return
+        start_time = time.time()
+        cleaned_phrases = [clean_up_tts_string(phrase) for phrase in phrases]
+        rendered = tts_engine.warm_up(cleaned_phrases)
+        if rendered:
+            print(f"🗣️ Pre-rendered {rendered} phrases in {time.time() - start_time:.2f}s")
+    
+    thread = threading.Thread(target=warm_up, name="tts-warmup", daemon=True)
+    thread.start()
+    return thread
+
 def clean_up_tts_string(text: str):
     text = text.replace("**", "")
     text = text.replace("*", "")
@@ -407,6 +1469,7 @@ def debug_model_access():
         for model in models_to_test:
             start_time = time.time()
             try:
+                from openai import OpenAI
                 test_client = OpenAI(api_key=OPENAI_SECRET)
                 response = test_client.chat.completions.create(
                     model=model,
@@ -429,6 +1492,7 @@ def debug_model_access():
         for model in models_to_test:
             start_time = time.time()
             try:
+                from anthropic import Anthropic
                 test_client = Anthropic(api_key=CLAUDE_SECRET)
                 response = test_client.messages.create(
                     model=model,
@@ -442,132 +1506,20 @@ def debug_model_access():
                 print(f"❌ {model}: {str(e)} ({elapsed:.2f}s)")
 
 
-def start_screen_monitor(text: str):
+def start_screen_monitor(text: str, intents=None):
     '''
         Checkes current_text to see if the user asked for screen monitoring to start
     '''
-    start_monitoring = [
-        # Direct commands
-        "start monitoring",
-        "start watching",
-        "start screen monitor",
-        "turn on monitoring",
-        "turn on screen monitor",
-        "screen monitor on",
-        "enable monitoring",
-        "enable screen monitor",
-        "activate monitoring",
-        "activate screen monitor",
-        
-        # More casual phrases
-        "watch the screen",
-        "monitor the screen",
-        "keep an eye on the screen",
-        "start screen recording",
-        "begin monitoring",
-        "begin watching",
-        "start tracking",
-        "track the screen",
-        "observe the screen",
-        "surveillance on",
-        
-        # Natural speech patterns
-        "can you monitor",
-        "please monitor",
-        "start to monitor",
-        "begin to watch",
-        "keep watch",
-        "watch my screen",
-        "monitor my screen",
-        "track my screen",
-        "record my screen",
-        "capture my screen",
-        
-        # Jarvis-style commands
-        "jarvis monitor",
-        "jarvis watch",
-        "jarvis start monitoring",
-        "jarvis screen on",
-        "monitor mode on",
-        "watching mode",
-        "surveillance mode",
-        
-        # Alternative phrasings
-        "switch on monitoring",
-        "fire up monitoring",
-        "boot up screen monitor",
-        "initialize monitoring",
-        "commence monitoring",
-        "engage monitoring"
-    ]
-    
-    if any(key_word in text.lower() for key_word in start_monitoring):
-        return True
-    return False
+    if intents is None:
+        intents = classify_intents(text)
+    return "start_monitoring" in intents
 
-def stop_screen_monitor(text: str):
+def stop_screen_monitor(text: str, intents=None):
     '''
         Checkes current_text to see if the user asked for screen monitoring to stop
     '''
-    stop_monitoring = [
-        # Direct commands
-        "stop monitoring",
-        "stop watching",
-        "stop screen monitor",
-        "turn off monitoring",
-        "turn off screen monitor",
-        "screen monitor off",
-        "disable monitoring",
-        "disable screen monitor",
-        "deactivate monitoring",
-        "deactivate screen monitor",
-        
-        # More casual phrases
-        "stop watching the screen",
-        "stop monitoring the screen",
-        "end monitoring",
-        "end watching",
-        "stop screen recording",
-        "stop tracking",
-        "stop tracking the screen",
-        "stop observing",
-        "surveillance off",
-        "quit monitoring",
-        
-        # Natural speech patterns
-        "stop monitoring please",
-        "please stop monitoring",
-        "can you stop monitoring",
-        "stop watching my screen",
-        "stop monitoring my screen",
-        "stop tracking my screen",
-        "stop recording my screen",
-        "stop capturing my screen",
-        
-        # Jarvis-style commands
-        "jarvis stop monitoring",
-        "jarvis stop watching",
-        "jarvis screen off",
-        "monitor mode off",
-        "watching mode off",
-        "surveillance mode off",
-        "jarvis disable monitoring",
-        
-        # Alternative phrasings
-        "switch off monitoring",
-        "shut down monitoring",
-        "shut off screen monitor",
-        "terminate monitoring",
-        "cease monitoring",
-        "halt monitoring",
-        "kill monitoring",
-        "cancel monitoring",
-        "exit monitoring",
-        "close monitoring"
-    ]
-    
-    if any(key_word in text.lower() for key_word in stop_monitoring):
-        return True
-    return False
+    if intents is None:
+        intents = classify_intents(text)
+    return "stop_monitoring" in intents
 
-__all__ = ['mixer']
\ No newline at end of file
+__all__ = ['stop_audio_output']
\ No newline at end of file